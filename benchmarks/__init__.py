@@ -0,0 +1,7 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Benchmarks of yltoolkit hot paths, run with `python -m benchmarks.run`.
+"""
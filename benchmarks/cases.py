@@ -0,0 +1,333 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Benchmark cases.
+"""
+
+if __name__ == "__main__":
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+
+import os
+from datetime import datetime
+from importlib.util import find_spec
+from itertools import cycle
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+from yltoolkit.file_handlers import get_file_hash, read_csv_to_list, write_csv
+from yltoolkit.hashing import Hasher
+from yltoolkit.YLDatetime import TimeStandard, YLDatetime, disable_format_cache, enable_format_cache
+from yltoolkit.YLDatetime.tools import format_as_excel
+
+from .datasets import BenchItem, BenchItemSet, generate_datetime_strings, generate_items
+
+
+class Prepared(NamedTuple):
+    """
+    The callable to be measured, an optional setup called before each run,
+    how many bytes a run processes when the case is measured in bandwidth,
+    and optionally one unit of the work of a run, whose allocations are measured call by call.
+    """
+
+    run: Callable[[], Any]
+    setup: Callable[[], Any] | None = None
+    processed_bytes: int = 0
+    call: Callable[[], Any] | None = None
+
+
+class Case(NamedTuple):
+    """
+    A benchmark case: `prepare` receives the dataset paths, row count and a scratch directory.
+    """
+
+    name: str
+    prepare: Callable[[dict[str, Path], int, Path], Prepared]
+
+
+CASES = dict[str, Case]()
+
+
+def in_turn(function: Callable[[Any], Any], values: list) -> Callable[[], Any]:
+    """
+    A call of `function` on the next of `values`, starting over after the last one.
+    """
+
+    values = cycle(values)
+    return lambda: function(next(values))
+
+
+def case(name: str):
+
+    def register(prepare):
+        CASES[name] = Case(name, prepare)
+        return prepare
+
+    return register
+
+
+def decode(filepath: Path, **kwargs) -> Callable[[], BenchItemSet]:
+
+    def run() -> BenchItemSet:
+        items = BenchItemSet()
+        items.decode(filepath, **kwargs)
+        return items
+
+    return run
+
+
+def encode(filepath: Path, rows: int, **kwargs) -> Callable[[], None]:
+
+    items = BenchItemSet()
+
+    for item in generate_items(rows):
+        items.update(item)
+
+    return lambda: items.encode(filepath, **kwargs)
+
+
+@case("codable_set.decode.csv")
+def decode_csv(paths, rows, scratch):
+    return Prepared(decode(paths["csv"]))
+
+
+@case("codable_set.decode.csv_workers")
+def decode_csv_workers(paths, rows, scratch):
+
+    run = decode(paths["csv"], workers=max(2, os.cpu_count() or 1))
+    serial, parallel = decode(paths["csv"])(), run()
+
+    # objects rebuilt from what the processes send back must be those of a serial decode, in the same order
+    if (list(parallel._object_dict) != list(serial._object_dict)
+            or parallel._id_sn != serial._id_sn
+            or any(type(a) is not type(b) or a.__dict__ != b.__dict__
+                   for a, b in zip(parallel._object_dict.values(), serial._object_dict.values()))):
+        raise AssertionError("Decoding in processes differs from decoding in this process.")
+
+    return Prepared(run)
+
+
+@case("codable_set.decode.ylcol")
+def decode_ylcol(paths, rows, scratch):
+    return Prepared(decode(paths["ylcol"]))
+
+
+@case("codable_set.decode.csv_plain")
+def decode_csv_plain(paths, rows, scratch):
+    return Prepared(decode(paths["csv_plain"], use_flatten=False))
+
+
+@case("codable_set.decode.csv_gz")
+def decode_csv_gz(paths, rows, scratch):
+    return Prepared(decode(paths["csv_gz"]))
+
+
+@case("codable_set.decode.json")
+def decode_json(paths, rows, scratch):
+    return Prepared(decode(paths["json"]))
+
+
+@case("codable_set.decode.csv_projected")
+def decode_csv_projected(paths, rows, scratch):
+    return Prepared(decode(paths["csv"], columns=["name", "status"], where={"status": "active"}))
+
+
+@case("codable_set.encode.csv")
+def encode_csv(paths, rows, scratch):
+    return Prepared(encode(scratch / "items.csv", rows))
+
+
+@case("codable_set.encode.csv_plain")
+def encode_csv_plain(paths, rows, scratch):
+    return Prepared(encode(scratch / "items-plain.csv", rows, use_flatten=False))
+
+
+@case("codable_set.encode.csv_gz")
+def encode_csv_gz(paths, rows, scratch):
+    return Prepared(encode(scratch / "items.csv.gz", rows, compresslevel=6))
+
+
+@case("codable_set.encode.json")
+def encode_json(paths, rows, scratch):
+    return Prepared(encode(scratch / "items.json", rows))
+
+
+def lazy_round_trip(filepath: Path, scratch: Path) -> Callable[[], None]:
+    """
+    Decode `filepath` lazily, read one item and encode the set, untouched rows being dumped raw.
+    """
+
+    # raw rows must be dumped as their objects would be encoded
+    items = decode(filepath, lazy=True)()
+
+    for entry in items._object_dict._entries.values():
+        if entry.source.dump(entry.payload) != entry.source.load(entry.payload).to_dict():
+            raise AssertionError(f"Dumping raw rows of {filepath.name} differs from encoding their objects.")
+
+    def run():
+        items = decode(filepath, lazy=True)()
+        items.get_item_by_id("1")
+        items.encode(scratch / f"lazy-{filepath.name}")
+
+    return run
+
+
+@case("codable_set.lazy_round_trip.csv")
+def lazy_round_trip_csv(paths, rows, scratch):
+    return Prepared(lazy_round_trip(paths["csv"], scratch))
+
+
+@case("codable_set.lazy_round_trip.json")
+def lazy_round_trip_json(paths, rows, scratch):
+    return Prepared(lazy_round_trip(paths["json"], scratch))
+
+
+@case("codable_set.lazy_round_trip.ylcol")
+def lazy_round_trip_ylcol(paths, rows, scratch):
+    return Prepared(lazy_round_trip(paths["ylcol"], scratch))
+
+
+@case("file_handlers.read_csv")
+def read_csv(paths, rows, scratch):
+    return Prepared(lambda: read_csv_to_list(paths["csv"]))
+
+
+@case("file_handlers.read_csv_projected")
+def read_csv_projected(paths, rows, scratch):
+    return Prepared(lambda: read_csv_to_list(paths["csv"], columns=["id", "name"], where={"status": "active"}))
+
+
+@case("file_handlers.write_csv")
+def write_csv_case(paths, rows, scratch):
+
+    items = read_csv_to_list(paths["csv"])
+    return Prepared(lambda: write_csv(items, scratch / "written.csv"))
+
+
+@case("file_handlers.get_file_hash")
+def get_file_hash_case(paths, rows, scratch):
+    return Prepared(lambda: get_file_hash(paths["blob"]))
+
+
+@case("codable.to_dict")
+def to_dict(paths, rows, scratch):
+
+    items = generate_items(rows)
+    return Prepared(lambda: BenchItem.to_dicts(items), call=in_turn(BenchItem.to_dict, items))
+
+
+@case("codable.to_dict.plain_datetime")
+def to_dict_plain_datetime(paths, rows, scratch):
+
+    items = generate_items(rows)
+
+    # plain datetimes are encoded by `tools.format_as_excel`
+    for item in items:
+        item.created = datetime(*item.created.timetuple()[:6], tzinfo=item.created.tzinfo)
+
+    return Prepared(lambda: BenchItem.to_dicts(items), call=in_turn(BenchItem.to_dict, items))
+
+
+@case("codable.to_dict.format_cache")
+def to_dict_format_cache(paths, rows, scratch):
+
+    items = generate_items(rows)
+
+    # batch imports: a few hundred distinct timestamps
+    for index, item in enumerate(items):
+        item.created = items[index % 256].created
+
+    def run():
+        enable_format_cache()
+
+        try:
+            return BenchItem.to_dicts(items)
+        finally:
+            disable_format_cache()
+
+    return Prepared(run)
+
+
+@case("yldatetime.tools.format_as_excel")
+def tools_format_as_excel(paths, rows, scratch):
+
+    datetimes = [datetime(*item.created.timetuple()[:6], tzinfo=item.created.tzinfo)
+                 for item in generate_items(rows)]
+    return Prepared(lambda: [format_as_excel(dt, TimeStandard.CST) for dt in datetimes])
+
+
+@case("yldatetime.parse")
+def parse(paths, rows, scratch):
+
+    strings = generate_datetime_strings(rows)
+    return Prepared(lambda: [YLDatetime.parse(string) for string in strings])
+
+
+@case("yldatetime.as_excel")
+def as_excel(paths, rows, scratch):
+
+    datetimes = [item.created for item in generate_items(rows)]
+    return Prepared(lambda: [datetime.as_excel() for datetime in datetimes])
+
+
+@case("yldatetime.parse_many")
+def parse_many(paths, rows, scratch):
+
+    strings = generate_datetime_strings(rows)
+    return Prepared(lambda: YLDatetime.parse_many(strings))
+
+
+@case("yldatetime.format_many")
+def format_many(paths, rows, scratch):
+
+    datetimes = [item.created for item in generate_items(rows)]
+    return Prepared(lambda: YLDatetime.format_many(datetimes))
+
+
+if find_spec("numpy") is not None:
+
+    @case("yldatetime.parse_many.datetime64")
+    def parse_many_datetime64(paths, rows, scratch):
+
+        strings = [datetime.as_excel() for datetime in YLDatetime.parse_many(generate_datetime_strings(rows))]
+        return Prepared(lambda: YLDatetime.parse_many(strings, TimeStandard.CST, datetime64=True))
+
+    @case("yldatetime.format_many.datetime64")
+    def format_many_datetime64(paths, rows, scratch):
+
+        instants = YLDatetime.parse_many([item.created for item in generate_items(rows)], datetime64=True)
+        return Prepared(lambda: YLDatetime.format_many(instants, TimeStandard.CST))
+
+
+def hash_file_case(algorithm: str, chunk_size: int):
+
+    def prepare(paths, rows, scratch):
+        filepath = paths["blob_large"]
+        run = lambda: Hasher(algorithm).update_file(filepath, chunk_size=chunk_size, use_mmap=False).hexdigest()
+        return Prepared(run, processed_bytes=filepath.stat().st_size)
+
+    return prepare
+
+
+def hash_file_mmap_case(algorithm: str):
+
+    def prepare(paths, rows, scratch):
+        filepath = paths["blob_large"]
+        run = lambda: Hasher(algorithm).update_file(filepath, use_mmap=True).hexdigest()
+        return Prepared(run, processed_bytes=filepath.stat().st_size)
+
+    return prepare
+
+
+for algorithm in ("md5", "blake2b", "sha256"):
+
+    for chunk_size in (1 << 16, 1 << 20, 1 << 23):
+        case(f"hashing.{algorithm}.read.{chunk_size >> 10}k")(
+            hash_file_case(algorithm, chunk_size))
+
+    case(f"hashing.{algorithm}.mmap")(hash_file_mmap_case(algorithm))
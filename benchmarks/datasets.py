@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Synthetic Codable types and datasets.
+"""
+
+if __name__ == "__main__":
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+
+from yltoolkit.representations import Codable, CodableSet
+from yltoolkit.YLDatetime import TimeStandard, YLDatetime
+from yltoolkit.YLEnum import YLEnum, auto
+
+
+class BenchStatus(YLEnum):
+    ACTIVE = auto()
+    INACTIVE = auto()
+    ARCHIVED = auto()
+
+
+@dataclass
+class BenchItem(Codable):
+    name: str = None
+    status: BenchStatus = None
+    count: int = None
+    score: float = None
+    flag: bool = None
+    created: YLDatetime = None
+    path: Path = None
+    tags: list[str] = field(default_factory=list)
+
+
+class BenchItemSet(CodableSet[BenchItem]):
+    _object_type = BenchItem
+
+
+# hashing cases read a file large enough to be hashed out of the page cache as much as in it
+LARGE_BLOB_SIZE = 64 << 20
+
+EPOCH = YLDatetime(2023, 1, 1, tzinfo=TimeStandard.UTC.tzinfo)
+
+
+def generate_items(rows: int, *, seed: int = 0) -> list[BenchItem]:
+    """
+    `rows` items with repeating enums and tags, distinct names and growing datetimes, reproducible for a seed.
+    """
+
+    generator = random.Random(seed)
+    statuses = BenchStatus.all_members
+
+    return [BenchItem(id=f"{i + 1}",
+                      name=f"item-{i + 1:08d}",
+                      status=statuses[i % len(statuses)],
+                      count=generator.randrange(1 << 20),
+                      score=round(generator.random() * 100, 3),
+                      flag=i % 2 == 0,
+                      created=EPOCH + timedelta(seconds=37 * i),
+                      path=Path(f"/data/{i % 100:02d}/{i + 1}.bin"),
+                      tags=[f"tag-{j}" for j in range(generator.randrange(4))])
+            for i in range(rows)]
+
+
+def generate_datetime_strings(rows: int) -> list[str]:
+    """
+    Timestamps formatted the ways `YLDatetime.parse` meets them in files.
+    """
+
+    formats = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S%z", "%Y/%m/%d %H:%M"]
+
+    return [(EPOCH + timedelta(seconds=37 * i)).strftime(formats[i % len(formats)])
+            for i in range(rows)]
+
+
+def prepare_dataset(directory: Path, rows: int) -> dict[str, Path]:
+    """
+    Write the files of a dataset once into `directory`, reusing them on later runs.
+    Return file paths by name: `csv` (flattened), `csv_plain` (not flattened), `csv_gz` (flattened, gzip), `json`, `ylcol`, `blob` (random bytes)
+    and `blob_large` (random bytes of `LARGE_BLOB_SIZE` whatever the size of the dataset).
+    """
+
+    directory = directory / f"rows-{rows}"
+    directory.mkdir(parents=True, exist_ok=True)
+
+    paths = {"csv": directory / "items.csv",
+             "csv_plain": directory / "items-plain.csv",
+             "csv_gz": directory / "items.csv.gz",
+             "json": directory / "items.json",
+             "ylcol": directory / "items.ylcol",
+             "blob": directory / "blob.bin",
+             "blob_large": directory.parent / "blob-large.bin"}
+
+    if not all(path.exists() for path in paths.values()):
+        items = BenchItemSet()
+
+        for item in generate_items(rows):
+            items.update(item)
+
+        items.encode(paths["csv"])
+        items.encode(paths["csv_plain"], use_flatten=False)
+        items.encode(paths["csv_gz"])
+        items.encode(paths["json"])
+        items.encode(paths["ylcol"])
+
+        # about 100 bytes per row, like the CSV file
+        with open(paths["blob"], "wb") as file:
+            file.write(random.Random(rows).randbytes(rows * 100))
+
+    if not paths["blob_large"].exists():
+        with open(paths["blob_large"], "wb") as file:
+            generator = random.Random(0)
+
+            for _ in range(LARGE_BLOB_SIZE >> 20):
+                file.write(generator.randbytes(1 << 20))
+
+    return paths
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Measurement of benchmark cases.
+"""
+
+if __name__ == "__main__":
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+
+import gc
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class Measurement:
+    """
+    Result of a benchmark case on a dataset size.
+    """
+
+    case: str
+    rows: int
+    repeat: int
+    # best and median wall time of the runs
+    best: float
+    median: float
+    # peak of memory traced by `tracemalloc` during one run, in bytes
+    peak_memory: int
+    # memory blocks allocated during one run and not freed before its end
+    allocations: int
+    # bytes of input processed by one run, for cases measured in bandwidth
+    processed_bytes: int = 0
+    # bytes allocated at the peak of one call of the unit of work of a case (e.g. encoding one item), on average:
+    # temporaries freed before the end of a run are counted, unlike `allocations`
+    call_memory: int = 0
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}@{self.rows}"
+
+    @property
+    def throughput(self) -> float:
+        """
+        Rows per second of the best run.
+        """
+        return self.rows / self.best if self.best > 0 else float("inf")
+
+    @property
+    def bandwidth(self) -> float | None:
+        """
+        Processed bytes per second of the best run.
+        """
+
+        if not self.processed_bytes:
+            return None
+
+        return self.processed_bytes / self.best if self.best > 0 else float("inf")
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self) | {"throughput": self.throughput, "bandwidth": self.bandwidth}
+
+    @classmethod
+    def from_dict(cls, mapping: dict[str, Any]) -> "Measurement":
+        mapping = dict(mapping)
+        mapping.pop("throughput", None)
+        mapping.pop("bandwidth", None)
+        return cls(**mapping)
+
+
+def measure_call_memory(call: Callable[[], Any], calls: int = 256) -> int:
+    """
+    Bytes traced by `tracemalloc` at the peak of each of `calls` calls of `call`, beyond those traced before it, on average.
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    total = 0
+
+    try:
+        for _ in range(calls):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+
+            result = call()
+
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - current
+
+            del result
+    finally:
+        tracemalloc.stop()
+
+    return total // calls
+
+
+def measure(case: str, rows: int, run: Callable[[], Any], *, repeat: int = 3, setup: Callable[[], Any] = None, processed_bytes: int = 0, call: Callable[[], Any] = None) -> Measurement:
+    """
+    Time `run` `repeat` times, then run it once more under `tracemalloc` for memory.
+    `setup` is called before every run and not timed.
+    `call` is the unit of work of the case, measured by `measure_call_memory` if given.
+    """
+
+    durations = list[float]()
+
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - start)
+
+    if setup is not None:
+        setup()
+
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+
+        result = run()
+
+        _, peak_memory = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    # the result of the run is still referenced: what it holds counts as allocated
+    del result
+
+    allocations = sum(max(stat.count_diff, 0)
+                      for stat in after.compare_to(before, "lineno"))
+    durations.sort()
+
+    return Measurement(case=case,
+                       rows=rows,
+                       repeat=repeat,
+                       best=durations[0],
+                       median=durations[len(durations) // 2],
+                       peak_memory=peak_memory,
+                       allocations=allocations,
+                       processed_bytes=processed_bytes,
+                       call_memory=measure_call_memory(call) if call is not None else 0)
+
+
+def compare(current: list[Measurement], baseline: list[Measurement], *, threshold: float = 0.1) -> list[tuple[Measurement, Measurement, float]]:
+    """
+    Cases of `current` slower than in `baseline` by more than `threshold` (a ratio of the baseline best time),
+    as `(current, baseline, change)` tuples.
+    """
+
+    baseline_by_key = {measurement.key: measurement
+                       for measurement in baseline}
+    regressions = list[tuple[Measurement, Measurement, float]]()
+
+    for measurement in current:
+        previous = baseline_by_key.get(measurement.key)
+
+        if previous is None or previous.best <= 0:
+            continue
+
+        change = measurement.best / previous.best - 1
+
+        if change > threshold:
+            regressions.append((measurement, previous, change))
+
+    return regressions
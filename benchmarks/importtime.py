@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Measure the import time of yltoolkit modules with `python -X importtime`, and fail when one is over its start-up
+budget or loads a dependency that should only be imported on first use.
+
+    python -m benchmarks.importtime --modules yltoolkit.representations --budget 50 --top 10
+"""
+
+if __name__ == "__main__" and __package__ in (None, ""):
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+    __package__ = "benchmarks"
+
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# milliseconds of imports, beyond those of the interpreter start-up, allowed to each module
+DEFAULT_BUDGETS = {
+    "yltoolkit.representations": 30,
+    "yltoolkit.representations.Codable": 60,
+    "yltoolkit.representations.CodableSet": 120,
+    "yltoolkit.YLDatetime": 40,
+    "yltoolkit.file_handlers": 100,
+}
+
+# dependencies imported when first used only, none of the modules above may load them
+DEFAULT_FORBIDDEN = ["PIL", "loguru", "dateutil", "flatten_dict", "numpy", "zoneinfo", "multiprocessing"]
+
+
+class ImportEntry(NamedTuple):
+    """
+    A line of `-X importtime`: a module, how deep in the imports it was, and its own and cumulative time in µs.
+    """
+
+    name: str
+    depth: int
+    self_time: int
+    cumulative: int
+
+
+class ImportProfile(NamedTuple):
+    """
+    Modules imported by importing `module` in a fresh interpreter, those of its start-up left out.
+    """
+
+    module: str
+    entries: list[ImportEntry]
+
+    @property
+    def total(self) -> float:
+        """
+        Seconds spent importing.
+        """
+        return sum(entry.cumulative for entry in self.entries if entry.depth == 0) / 1_000_000
+
+    def loaded(self, package: str) -> bool:
+        return any(entry.name == package or entry.name.startswith(f"{package}.") for entry in self.entries)
+
+
+def parse_importtime(output: str) -> list[ImportEntry]:
+    """
+    Entries of `-X importtime` output, in the order printed: a module comes after the modules it imported.
+    """
+
+    entries = list[ImportEntry]()
+
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        self_time, cumulative, name = line.removeprefix("import time:").split("|")
+
+        # the header line
+        if not self_time.strip().isdigit():
+            continue
+
+        # one space after the separator, then two per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append(ImportEntry(name.strip(), depth, int(self_time), int(cumulative)))
+
+    return entries
+
+
+def run_importtime(code: str) -> list[ImportEntry]:
+
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT),
+                                                                            os.environ.get("PYTHONPATH")])))
+
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                               env=environment, cwd=ROOT, capture_output=True, text=True, check=True)
+
+    return parse_importtime(completed.stderr)
+
+
+def profile_import(module: str, repeat: int = 5) -> ImportProfile:
+    """
+    Import `module` in `repeat` fresh interpreters and keep the fastest, start-up imports left out.
+    """
+
+    startup = {entry.name for entry in run_importtime("pass")}
+    profiles = list[ImportProfile]()
+
+    for _ in range(repeat):
+        entries = [entry for entry in run_importtime(f"import {module}") if entry.name not in startup]
+        profiles.append(ImportProfile(module, entries))
+
+    return min(profiles, key=lambda profile: profile.total)
+
+
+def parse_arguments(argv: list[str] = None) -> argparse.Namespace:
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.importtime",
+                                     description="Check the import time of yltoolkit modules against budgets.")
+    parser.add_argument("--modules", nargs="+", default=list(DEFAULT_BUDGETS),
+                        help="modules to import, each in a fresh interpreter")
+    parser.add_argument("--budget", type=float,
+                        help="milliseconds allowed to every module, instead of their default budgets")
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN,
+                        help="packages none of the modules may import")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0,
+                        help="also list the modules taking the most time of their own")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] = None) -> int:
+
+    arguments = parse_arguments(argv)
+    failures = list[str]()
+
+    print(f"{'module':<40} {'best ms':>9} {'budget ms':>10} {'modules':>8}")
+
+    for module in arguments.modules:
+        profile = profile_import(module, arguments.repeat)
+        budget = arguments.budget if arguments.budget is not None else DEFAULT_BUDGETS.get(module)
+
+        print(f"{module:<40} {profile.total * 1000:>9.1f} {budget if budget is not None else '-':>10} "
+              f"{len(profile.entries):>8}")
+
+        for entry in sorted(profile.entries, key=lambda entry: entry.self_time, reverse=True)[:arguments.top]:
+            print(f"    {entry.name:<36} {entry.self_time / 1000:>9.1f} {entry.cumulative / 1000:>10.1f}")
+
+        if budget is not None and profile.total * 1000 > budget:
+            failures.append(f"{module}: {profile.total * 1000:.1f} ms over the budget of {budget} ms")
+
+        for package in arguments.forbid:
+            if profile.loaded(package):
+                failures.append(f"{module}: imports {package}")
+
+    for failure in failures:
+        print(f"FAILED {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
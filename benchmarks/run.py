@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Run benchmarks, save the results as JSON and flag regressions against an earlier run.
+
+    python -m benchmarks.run --rows 10000 100000 --output results.json --compare baseline.json
+"""
+
+if __name__ == "__main__" and __package__ in (None, ""):
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+    __package__ = "benchmarks"
+
+
+import argparse
+import fnmatch
+import json
+import platform
+import sys
+import tempfile
+from pathlib import Path
+
+from yltoolkit.logger import logger
+from yltoolkit.YLDatetime import YLDatetime
+
+from .cases import CASES
+from .datasets import prepare_dataset
+from .harness import Measurement, compare, measure
+
+
+def parse_arguments(argv: list[str] = None) -> argparse.Namespace:
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run",
+                                     description="Benchmark yltoolkit hot paths.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000],
+                        help="dataset sizes, e.g. 10000 100000 1000000")
+    parser.add_argument("--cases", nargs="+", default=["*"],
+                        help="case name patterns, e.g. 'codable_set.*'")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--datasets", type=Path, default=Path(tempfile.gettempdir()) / "yltoolkit-benchmarks",
+                        help="directory of generated datasets, reused between runs")
+    parser.add_argument("--output", type=Path,
+                        help="save the results into this JSON file")
+    parser.add_argument("--compare", type=Path,
+                        help="JSON results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="slowdown ratio flagged as a regression")
+    parser.add_argument("--list", action="store_true",
+                        help="list the cases and exit")
+
+    return parser.parse_args(argv)
+
+
+def select_cases(patterns: list[str]) -> list[str]:
+    return [name for name in CASES
+            if any(fnmatch.fnmatch(name, pattern) for pattern in patterns)]
+
+
+def format_row(measurement: Measurement) -> str:
+
+    bandwidth = f"{measurement.bandwidth / 1024 / 1024:>9.1f}" \
+        if measurement.bandwidth is not None else f"{'-':>9}"
+
+    return (f"{measurement.case:<32} {measurement.rows:>9} "
+            f"{measurement.best * 1000:>10.1f} {measurement.throughput:>12,.0f} {bandwidth} "
+            f"{measurement.peak_memory / 1024 / 1024:>9.1f} {measurement.allocations:>10} "
+            f"{measurement.call_memory or '-':>8}")
+
+
+def load_results(filepath: Path) -> list[Measurement]:
+
+    with open(filepath, "r", encoding="utf-8") as file:
+        results = json.load(file)
+
+    return [Measurement.from_dict(mapping) for mapping in results["measurements"]]
+
+
+def save_results(filepath: Path, measurements: list[Measurement]):
+
+    results = {"created": YLDatetime.now().as_iso(),
+               "python": platform.python_version(),
+               "platform": platform.platform(),
+               "measurements": [measurement.to_dict() for measurement in measurements]}
+
+    with open(filepath, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=4)
+
+
+def main(argv: list[str] = None) -> int:
+
+    arguments = parse_arguments(argv)
+    names = select_cases(arguments.cases)
+
+    if arguments.list:
+        print("\n".join(names))
+        return 0
+
+    # decode / encode log every call
+    logger.disable("yltoolkit")
+
+    print(f"{'case':<32} {'rows':>9} {'best ms':>10} {'rows/s':>12} {'MiB/s':>9} {'peak MiB':>9} {'allocs':>10} {'B/call':>8}")
+
+    measurements = list[Measurement]()
+
+    for rows in arguments.rows:
+        paths = prepare_dataset(arguments.datasets, rows)
+
+        with tempfile.TemporaryDirectory() as scratch:
+
+            for name in names:
+                prepared = CASES[name].prepare(paths, rows, Path(scratch))
+
+                measurement = measure(name, rows, prepared.run,
+                                      repeat=arguments.repeat, setup=prepared.setup,
+                                      processed_bytes=prepared.processed_bytes, call=prepared.call)
+                measurements.append(measurement)
+
+                print(format_row(measurement))
+
+    if arguments.output is not None:
+        save_results(arguments.output, measurements)
+
+    if arguments.compare is not None:
+        regressions = compare(measurements, load_results(arguments.compare),
+                              threshold=arguments.threshold)
+
+        for measurement, previous, change in regressions:
+            print(f"REGRESSION {measurement.key}: {previous.best * 1000:.1f} ms -> "
+                  f"{measurement.best * 1000:.1f} ms ({change:+.0%})")
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,7 +15,6 @@ if __name__ == "__main__":
 
 
 import datetime
-from zoneinfo import ZoneInfo
 
 from yltoolkit.YLEnum import YLEnum, auto
 
@@ -31,11 +30,39 @@ class TimeStandard(YLEnum):
         return tzinfos[self]
 
 
-local_tzinfo = datetime.datetime.now().astimezone().tzinfo
+def resolve_tzinfo(standard: TimeStandard) -> datetime.tzinfo:
+    """
+    Time zone of a standard, loading the time zone database or reading the local time zone only here.
+    """
 
+    match standard:
+        case TimeStandard.UTC:
+            return datetime.timezone.utc
+        case TimeStandard.CST:
+            from zoneinfo import ZoneInfo
+            return ZoneInfo("Asia/Shanghai")
+        case TimeStandard.LOCAL:
+            return datetime.datetime.now().astimezone().tzinfo
+        case _:
+            raise NotImplementedError(f"Time standard {standard} is not supported.")
 
-tzinfos: dict[TimeStandard, datetime.tzinfo] = {
-    TimeStandard.UTC: datetime.timezone.utc,
-    TimeStandard.CST: ZoneInfo("Asia/Shanghai"),
-    TimeStandard.LOCAL: local_tzinfo
-}
+
+class _TzinfoDict(dict[TimeStandard, datetime.tzinfo]):
+    """
+    Time zones of standards, each resolved on first lookup rather than when the module is imported.
+    """
+
+    def __missing__(self, standard: TimeStandard) -> datetime.tzinfo:
+        tzinfo = self[standard] = resolve_tzinfo(standard)
+        return tzinfo
+
+
+tzinfos: dict[TimeStandard, datetime.tzinfo] = _TzinfoDict()
+
+
+def __getattr__(name: str):
+    # `local_tzinfo` is read from the system when first asked for
+    if name == "local_tzinfo":
+        return tzinfos[TimeStandard.LOCAL]
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -15,14 +15,156 @@ if __name__ == "__main__":
 
 
 import datetime
-from typing import Self
-
-from dateutil import parser
+import re
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Iterable, Literal, Self, Sequence, overload
 
 from yltoolkit.YLDatetime.TimeStandard import TimeStandard
 
+if TYPE_CHECKING:
+    # optional, imported by the batch APIs asked for arrays only
+    import numpy
+
 READABLE_FORMAT = "%Y-%m-%d %a %H:%M:%S"
 EXCEL_FORMAT = "%Y-%m-%d %H:%M:%S"
+# `EXCEL_FORMAT` by %-formatting, the year unpadded as by `strftime`
+_EXCEL_TEMPLATE = "%d-%02d-%02d %02d:%02d:%02d"
+
+
+FormatStyle = Literal["excel", "iso", "readable"]
+
+
+def format_excel(dt: datetime.datetime) -> str:
+    """
+    `dt.strftime(EXCEL_FORMAT)`, without the cost of `strftime`.
+    """
+    return _EXCEL_TEMPLATE % (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
+
+
+def _format_datetime(dt: datetime.datetime, style: FormatStyle, standard: TimeStandard = None) -> str:
+
+    if standard is not None:
+        dt = dt.astimezone(tz=standard.tzinfo)
+
+    match style:
+        case "excel":
+            return format_excel(dt)
+        case "iso":
+            return dt.isoformat(timespec="seconds")
+        case "readable":
+            return dt.strftime(READABLE_FORMAT)
+        case _:
+            raise NotImplementedError(f"Format style {style} is not supported.")
+
+
+def format_datetime(dt: datetime.datetime, style: FormatStyle, standard: TimeStandard = None) -> str:
+    """
+    `dt` converted to `standard` if given and formatted in `style`, through the format cache when enabled.
+    """
+
+    if format_cache is not None:
+        return format_cache.format(dt, style, standard)
+
+    return _format_datetime(dt, style, standard)
+
+
+class FormatCache:
+    """
+    Bounded cache of formatted datetimes, for exports repeating the same timestamps.
+    Keyed by the datetime, its time zone and fold, the style and the standard.
+    @param eviction: evict the least recently used entry ("lru"), or the oldest one ("fifo", cheaper hits)
+    """
+
+    def __init__(self, maxsize: int = 1 << 16, eviction: Literal["lru", "fifo"] = "lru") -> None:
+
+        if maxsize <= 0:
+            raise ValueError(f"Cache size must be positive, got {maxsize}.")
+
+        if eviction not in ("lru", "fifo"):
+            raise NotImplementedError(f"Eviction {eviction} is not supported.")
+
+        self.maxsize = maxsize
+        self.eviction = eviction
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict[tuple, str]()
+        self._lock = threading.Lock()
+
+    def format(self, dt: datetime.datetime, style: FormatStyle, standard: TimeStandard = None) -> str:
+
+        key = (dt, dt.tzinfo, dt.fold, style, standard)
+
+        try:
+            with self._lock:
+                string = self._entries.get(key)
+
+                if string is not None:
+                    self.hits += 1
+
+                    if self.eviction == "lru":
+                        self._entries.move_to_end(key)
+
+                    return string
+
+                self.misses += 1
+
+        except TypeError:
+            # unhashable time zones (dateutil's) are formatted every time
+            return _format_datetime(dt, style, standard)
+
+        string = _format_datetime(dt, style, standard)
+
+        with self._lock:
+            self._entries[key] = string
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return string
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, int | float]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self), "maxsize": self.maxsize, "hit_rate": self.hit_rate}
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# disabled unless `enable_format_cache` is called
+format_cache: FormatCache | None = None
+
+
+def enable_format_cache(maxsize: int = 1 << 16, eviction: Literal["lru", "fifo"] = "lru") -> FormatCache:
+    """
+    Cache the results of `as_excel`, `as_iso`, `as_readable`, `format_many`, the `tools.format_as_*` helpers
+    and so of `Codable.to_dict`, replacing any cache enabled before.
+    """
+
+    global format_cache
+    format_cache = FormatCache(maxsize, eviction)
+
+    return format_cache
+
+
+def disable_format_cache():
+
+    global format_cache
+    format_cache = None
 
 
 class YLDatetime(datetime.datetime):
@@ -37,25 +179,24 @@ class YLDatetime(datetime.datetime):
         return self.convert_timestandard(standard=TimeStandard.UTC)
 
     def as_iso(self, standard: TimeStandard = None) -> str:
-        if standard is not None:
-            self = self.convert_timestandard(standard=standard)
-        return self.isoformat(timespec="seconds")
+        return format_datetime(self, "iso", standard)
 
     def as_readable(self, standard: TimeStandard = None) -> str:
-        if standard is not None:
-            self = self.convert_timestandard(standard=standard)
-        return self.strftime(READABLE_FORMAT)
+        return format_datetime(self, "readable", standard)
 
     def as_excel(self, standard: TimeStandard = None) -> str:
-        if standard is not None:
-            self = self.convert_timestandard(standard=standard)
-        return self.strftime(EXCEL_FORMAT)
+        return format_datetime(self, "excel", standard)
 
     def strftime(self, __format: str) -> str:
         return super().strftime(__format)
 
     @classmethod
     def init_from_datetime(cls, dt: datetime.datetime) -> Self:
+
+        # immutable, shared rather than copied
+        if dt.__class__ is YLDatetime:
+            return dt
+
         return YLDatetime(
             year=dt.year,
             month=dt.month,
@@ -91,17 +232,76 @@ class YLDatetime(datetime.datetime):
         If timestr doesn't include a time zone info, the result will be *FORCED / REPLACED* to `standard` when `standard` is not None.
         """
 
-        dt = parser.parse(timestr)
-        yl_dt = cls.init_from_datetime(dt)
+        return default_parser.parse(timestr, standard)
+
+    @overload
+    @classmethod
+    def parse_many(cls, values: Iterable[str | datetime.datetime], standard: TimeStandard = None, *,
+                   datetime64: Literal[False] = False) -> list[Self]: ...
 
-        if standard is not None:
+    @overload
+    @classmethod
+    def parse_many(cls, values: Iterable[str | datetime.datetime], standard: TimeStandard = None, *,
+                   datetime64: Literal[True]) -> "numpy.ndarray": ...
 
-            if yl_dt.tzinfo is not None:
-                yl_dt = yl_dt.convert_timestandard(standard)
-            else:
-                yl_dt = yl_dt.replace_timestandard(standard)
+    @classmethod
+    def parse_many(cls, values: Iterable[str | datetime.datetime], standard: TimeStandard = None, *,
+                   datetime64: bool = False) -> "list[Self] | numpy.ndarray":
+        """
+        `parse` of a column of values, with one parser remembering their format; datetimes are taken as they are.
+        @param datetime64: return a NumPy `datetime64[us]` array of UTC instants instead, naive values being taken
+            in `standard` (UTC if None). Columns of ISO 8601 datetimes without time zones are then parsed by NumPy.
+        """
+
+        if datetime64:
+            from yltoolkit.YLDatetime import vectorized
+
+            values = values if isinstance(values, Sequence) else list(values)
+            standard = standard or TimeStandard.UTC
+
+            wall_times = vectorized.parse_wall_times(values)
+
+            if wall_times is not None:
+                return vectorized.to_instants(wall_times, standard.tzinfo)
+
+            return vectorized.from_datetimes(cls.parse_many(values, standard))
 
-        return yl_dt
+        parser = DatetimeParser()
+
+        return [(value if isinstance(value, YLDatetime)
+                 else parser.parse_naive(value) if isinstance(value, str)
+                 else cls.init_from_datetime(value)).with_timestandard(standard)
+                for value in values]
+
+    @staticmethod
+    def format_many(values: "Iterable[str | datetime.datetime] | numpy.ndarray", standard: TimeStandard = None, *,
+                    style: FormatStyle = "excel") -> list[str]:
+        """
+        `as_excel`, `as_iso` or `as_readable` of a column of values, strings being parsed first.
+        NumPy `datetime64` arrays are taken as UTC instants (see `parse_many`) and formatted without per-value objects.
+        """
+
+        if getattr(values, "dtype", None) is not None and values.dtype.kind == "M":
+            return _format_datetime64(values, standard, style)
+
+        parser = DatetimeParser()
+        format_one = format_cache.format if format_cache is not None else _format_datetime
+
+        return [format_one(parser.parse_naive(value) if isinstance(value, str) else value, style, standard)
+                for value in values]
+
+    def with_timestandard(self, standard: TimeStandard | None) -> Self:
+        """
+        Converted to `standard` if aware, forced to it if naive, as it is if `standard` is None.
+        """
+
+        if standard is None:
+            return self
+
+        if self.tzinfo is not None:
+            return self.convert_timestandard(standard)
+        else:
+            return self.replace_timestandard(standard)
 
     @classmethod
     def load_date(cls, *, from_json: dict) -> datetime.date:
@@ -157,6 +357,169 @@ class YLDatetime(datetime.datetime):
                     f"Cannot replace date object with: {replace_components}.")
 
 
+def _format_datetime64(instants: "numpy.ndarray", standard: TimeStandard | None, style: str) -> list[str]:
+
+    from yltoolkit.YLDatetime import vectorized
+
+    instants = instants.astype("datetime64[us]")
+
+    if standard is None:
+        wall_times, offsets = instants, None
+    else:
+        offsets = vectorized.offsets_of_instants(instants, standard.tzinfo)
+        wall_times = instants + offsets.astype("timedelta64[us]")
+
+    match style:
+        case "excel":
+            return vectorized.format_wall_times(wall_times, " ").tolist()
+        case "iso":
+            return vectorized.format_wall_times(wall_times, "T", offsets).tolist()
+        case "readable":
+            return [dt.strftime(READABLE_FORMAT) for dt in wall_times.astype(object)]
+        case _:
+            raise NotImplementedError(f"Format style {style} is not supported.")
+
+
+# strptime directives understood by `FixedFormat`, as regular expressions of fixed widths:
+# `%Y%m%d` reads 8 digits only, as dateutil does
+_DIRECTIVES = {
+    "%Y": r"(?P<year>\d{4})",
+    "%m": r"(?P<month>\d{2})",
+    "%d": r"(?P<day>\d{2})",
+    "%H": r"(?P<hour>\d{2})",
+    "%M": r"(?P<minute>\d{2})",
+    "%S": r"(?P<second>\d{2})",
+    "%f": r"(?P<microsecond>\d{1,6})",
+    # weekday names are read and ignored, as by dateutil
+    "%a": r"[A-Za-z]{3}",
+}
+
+
+class FixedFormat:
+    """
+    A strptime format of numeric fields compiled into a regular expression, several times faster than `strptime`.
+    """
+
+    def __init__(self, format: str) -> None:
+
+        tokens = [token for token in re.split(r"(%.)", format) if token]
+
+        for token in tokens:
+            if token.startswith("%") and token not in _DIRECTIVES:
+                raise ValueError(f"Unsupported directive {token} in {format}.")
+
+        if not {"%Y", "%m", "%d"} <= set(tokens):
+            raise ValueError(f"{format} is not a format of full dates.")
+
+        self.format = format
+        self._match = re.compile("".join(_DIRECTIVES.get(token, re.escape(token))
+                                         for token in tokens)).fullmatch
+
+    def __call__(self, timestr: str) -> YLDatetime | None:
+        """
+        Naive datetime of `timestr`, or None if it does not match the format or is not a valid datetime.
+        """
+
+        match = self._match(timestr)
+
+        if match is None:
+            return None
+
+        fields = match.groupdict()
+        microsecond = fields.pop("microsecond", None)
+
+        try:
+            return YLDatetime(**{key: int(value) for key, value in fields.items()},
+                              microsecond=int(microsecond.ljust(6, "0")) if microsecond else 0)
+        except ValueError:
+            return None
+
+    def __repr__(self) -> str:
+        return f"FixedFormat({self.format!r})"
+
+
+def parse_iso(timestr: str) -> YLDatetime | None:
+    """
+    ISO 8601 with extended calendar dates (`2024-01-02`, `2024-01-02 03:04:05`, `2024-01-02T03:04:05.123+08:00` ...),
+    or None. Week dates and the like, which dateutil does not read, are left to it.
+    """
+
+    if len(timestr) < 10 or timestr[4] != "-" or timestr[7] != "-":
+        return None
+
+    try:
+        return YLDatetime.fromisoformat(timestr)
+    except ValueError:
+        return None
+
+
+# tried in this order after ISO 8601, then dateutil
+DEFAULT_FORMATS = (
+    READABLE_FORMAT,
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d %H:%M",
+    "%Y/%m/%d",
+    "%Y%m%d%H%M%S",
+    "%Y%m%d",
+)
+
+
+class DatetimeParser:
+    """
+    Parse datetime strings like `dateutil.parser.parse`, trying ISO 8601 (which covers `EXCEL_FORMAT`)
+    and fixed formats before it. The format that parsed the last string is tried first on the next one:
+    give each column or call site its own parser, its values are usually in one format.
+    """
+
+    def __init__(self, formats: Iterable[str] = DEFAULT_FORMATS) -> None:
+        self.methods: list[Callable[[str], YLDatetime | None]] = [
+            parse_iso, *(FixedFormat(format) for format in formats)]
+        self.remembered: Callable[[str], YLDatetime | None] | None = None
+        # strings left to dateutil
+        self.fallbacks = 0
+
+    def parse(self, timestr: str, standard: TimeStandard = None) -> YLDatetime:
+        """
+        See `YLDatetime.parse`.
+        """
+        return self.parse_naive(timestr).with_timestandard(standard)
+
+    def parse_naive(self, timestr: str) -> YLDatetime:
+        """
+        The datetime written in `timestr`, aware only if `timestr` has a time zone.
+        """
+
+        if isinstance(timestr, str):
+            remembered = self.remembered
+
+            if remembered is not None:
+                dt = remembered(timestr)
+
+                if dt is not None:
+                    return dt
+
+            for method in self.methods:
+                if method is remembered:
+                    continue
+
+                dt = method(timestr)
+
+                if dt is not None:
+                    self.remembered = method
+                    return dt
+
+        self.fallbacks += 1
+
+        # imported when a string first needs it, most never do
+        from dateutil import parser
+
+        return YLDatetime.init_from_datetime(parser.parse(timestr))
+
+
+# parser of `YLDatetime.parse`
+default_parser = DatetimeParser()
+
+
 if __name__ == "__main__":
     dt = YLDatetime.now(standard=TimeStandard.LOCAL)
     str_rep = dt.as_excel(standard=TimeStandard.CST)
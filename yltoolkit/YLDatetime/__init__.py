@@ -3,4 +3,4 @@
 
 from .TimeStandard import TimeStandard
 from .tools import *
-from .YLDatetime import YLDatetime
+from .YLDatetime import FormatCache, YLDatetime, disable_format_cache, enable_format_cache
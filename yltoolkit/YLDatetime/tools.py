@@ -3,34 +3,34 @@
 
 
 """
-Date and time helpers for `datetime.datetime`.
+Date and time helpers for `datetime.datetime`, working on the objects given without copying them into `YLDatetime`.
 """
 
 import datetime
 
 from .TimeStandard import TimeStandard
-from .YLDatetime import YLDatetime
+from .YLDatetime import format_datetime
 
 
 def replace_timestandard(datetime: datetime.datetime, standard: TimeStandard) -> datetime.datetime:
-    return YLDatetime.init_from_datetime(datetime).replace_timestandard(standard=standard)
+    return datetime.replace(tzinfo=standard.tzinfo)
 
 
 def convert_timestandard(datetime: datetime.datetime, standard: TimeStandard) -> datetime.datetime:
-    return YLDatetime.init_from_datetime(datetime).astimezone(tz=standard.tzinfo)
+    return datetime.astimezone(tz=standard.tzinfo)
 
 
 def convert_to_utc(datetime: datetime.datetime) -> datetime.datetime:
-    return YLDatetime.init_from_datetime(datetime).to_utc()
+    return datetime.astimezone(tz=TimeStandard.UTC.tzinfo)
 
 
 def format_as_iso(datetime: datetime.datetime, standard: TimeStandard = None) -> str:
-    return YLDatetime.init_from_datetime(datetime).as_iso(standard=standard)
+    return format_datetime(datetime, "iso", standard)
 
 
 def format_as_readable(datetime: datetime.datetime, standard: TimeStandard = None) -> str:
-    return YLDatetime.init_from_datetime(datetime).as_readable(standard=standard)
+    return format_datetime(datetime, "readable", standard)
 
 
 def format_as_excel(datetime: datetime.datetime, standard: TimeStandard = None) -> str:
-    return YLDatetime.init_from_datetime(datetime).as_excel(standard=standard)
+    return format_datetime(datetime, "excel", standard)
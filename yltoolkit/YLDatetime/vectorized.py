@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Timestamp columns as NumPy `datetime64[us]` arrays of UTC instants.
+NumPy is optional: this module is imported only by the batch APIs of `YLDatetime` asked for arrays.
+"""
+
+
+if __name__ == "__main__":
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "../..")))
+
+
+import datetime
+import warnings
+from typing import Callable, Sequence
+
+import numpy as np
+
+# time zones change offsets on quarter hours
+QUARTER_HOUR = 15 * 60
+# offsets are sampled this often over the span of a batch, then transitions are searched between samples
+SAMPLE_STEP = 6 * 60 * 60
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECONDS = 1_000_000
+
+
+def find_transitions(offset_at: Callable[[int], int], start: int, end: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Offset changes between epoch seconds `start` and `end`: (seconds where an offset starts, offsets),
+    the first offset holding before the first change.
+    """
+
+    start -= start % QUARTER_HOUR
+
+    points = list[int]()
+    previous_second = start
+    previous = offset_at(start)
+    values = [previous]
+
+    for second in range(start + SAMPLE_STEP, end + SAMPLE_STEP, SAMPLE_STEP):
+        offset = offset_at(second)
+
+        if offset != previous:
+            low, high = previous_second, second
+
+            # the first quarter hour of the new offset
+            while high - low > QUARTER_HOUR:
+                middle = low + (high - low) // QUARTER_HOUR // 2 * QUARTER_HOUR
+
+                if offset_at(middle) == previous:
+                    low = middle
+                else:
+                    high = middle
+
+            points.append(high)
+            values.append(offset)
+
+        previous_second, previous = second, offset
+
+    return np.array(points, dtype=np.int64), np.array(values, dtype=np.int64)
+
+
+def _offsets(values: np.ndarray, offset_at: Callable[[int], int], tzinfo: datetime.tzinfo) -> np.ndarray:
+    """
+    Offsets in microseconds of `datetime64[us]` values, resolving the transitions once for the whole array.
+    """
+
+    if isinstance(tzinfo, datetime.timezone):
+        return np.full(values.shape, tzinfo.utcoffset(None) // datetime.timedelta(microseconds=1), dtype=np.int64)
+
+    offsets = np.zeros(values.shape, dtype=np.int64)
+    valid = ~np.isnat(values)
+
+    if not valid.any():
+        return offsets
+
+    seconds = values[valid].astype(np.int64) // _MICROSECONDS
+    points, table = find_transitions(offset_at, int(seconds.min()), int(seconds.max()))
+
+    offsets[valid] = table[np.searchsorted(points, seconds, side="right")] * _MICROSECONDS
+
+    return offsets
+
+
+def offsets_of_instants(instants: np.ndarray, tzinfo: datetime.tzinfo) -> np.ndarray:
+    """
+    UTC offsets of `tzinfo`, in microseconds, at UTC instants.
+    """
+
+    def offset_at(second: int) -> int:
+        return int(datetime.datetime.fromtimestamp(second, tzinfo).utcoffset().total_seconds())
+
+    return _offsets(instants, offset_at, tzinfo)
+
+
+def offsets_of_wall_times(wall_times: np.ndarray, tzinfo: datetime.tzinfo) -> np.ndarray:
+    """
+    UTC offsets of `tzinfo`, in microseconds, of naive wall times, as `datetime.replace(tzinfo=tzinfo)` reads them.
+    """
+
+    def offset_at(second: int) -> int:
+        wall_time = _EPOCH + datetime.timedelta(seconds=second)
+        return int(wall_time.replace(tzinfo=tzinfo).utcoffset().total_seconds())
+
+    return _offsets(wall_times, offset_at, tzinfo)
+
+
+def is_calendar_datetimes(strings: Sequence) -> bool:
+    """
+    Whether all values are strings starting with an extended calendar date, which NumPy reads as dateutil does.
+    """
+    return all(isinstance(string, str) and len(string) >= 10 and string[4] == "-" and string[7] == "-"
+               for string in strings)
+
+
+def parse_wall_times(strings: Sequence[str]) -> np.ndarray | None:
+    """
+    Naive ISO 8601 datetimes parsed by NumPy, or None when any is not one.
+    """
+
+    if not is_calendar_datetimes(strings):
+        return None
+
+    with warnings.catch_warnings():
+        # NumPy warns about, and reads as UTC, time zones that must be converted as dateutil does
+        warnings.simplefilter("error")
+
+        try:
+            return np.array(strings, dtype="datetime64[us]")
+        except (ValueError, TypeError, Warning):
+            return None
+
+
+def to_instants(wall_times: np.ndarray, tzinfo: datetime.tzinfo) -> np.ndarray:
+    """
+    UTC instants of wall times in `tzinfo`.
+    """
+    return wall_times - offsets_of_wall_times(wall_times, tzinfo).astype("timedelta64[us]")
+
+
+def to_wall_times(instants: np.ndarray, tzinfo: datetime.tzinfo) -> np.ndarray:
+    """
+    Wall times in `tzinfo` of UTC instants.
+    """
+    return instants + offsets_of_instants(instants, tzinfo).astype("timedelta64[us]")
+
+
+def from_datetimes(datetimes: Sequence[datetime.datetime]) -> np.ndarray:
+    """
+    UTC instants of aware datetimes.
+    """
+    return np.array([dt.astimezone(datetime.timezone.utc).replace(tzinfo=None) for dt in datetimes],
+                    dtype="datetime64[us]")
+
+
+def format_offsets(offsets: np.ndarray) -> np.ndarray:
+    """
+    `+HH:MM` strings of offsets in microseconds, as `datetime.isoformat` writes them:
+    `:SS` and `.ffffff` follow when there are seconds or microseconds, e.g. local mean times before 1901.
+    """
+
+    unique, inverse = np.unique(offsets, return_inverse=True)
+    strings = list[str]()
+
+    for offset in unique.tolist():
+        sign = "-" if offset < 0 else "+"
+        seconds, microseconds = divmod(abs(offset), _MICROSECONDS)
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+
+        string = f"{sign}{hours:02d}:{minutes:02d}"
+
+        if seconds or microseconds:
+            string += f":{seconds:02d}"
+
+            if microseconds:
+                string += f".{microseconds:06d}"
+
+        strings.append(string)
+
+    return np.array(strings)[inverse.reshape(offsets.shape)]
+
+
+def format_wall_times(wall_times: np.ndarray, separator: str, offsets: np.ndarray = None) -> np.ndarray:
+    """
+    `YYYY-MM-DD HH:MM:SS` strings of wall times, with `separator` between date and time, followed by `offsets` if given.
+    """
+
+    strings = np.datetime_as_string(wall_times.astype("datetime64[s]"))
+
+    if separator != "T":
+        strings = np.char.replace(strings, "T", separator)
+
+    if offsets is not None:
+        strings = np.char.add(strings, format_offsets(offsets))
+
+    return strings
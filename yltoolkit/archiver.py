@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Zip archives of directory trees, compressed in threads and updated incrementally.
+"""
+
+if __name__ == "__main__":
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+
+import os
+import shutil
+import struct
+import tempfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Iterator, NamedTuple
+
+# contents already compressed, stored as they are: deflating them again costs time for nothing
+STORED_SUFFIXES = frozenset({
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".heic", ".heif", ".avif",
+    ".mp3", ".m4a", ".aac", ".ogg", ".opus", ".flac",
+    ".mp4", ".m4v", ".mov", ".mkv", ".webm", ".avi",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".rar",
+    ".docx", ".xlsx", ".pptx", ".pdf",
+})
+
+CHUNK_SIZE = 1 << 20
+# compressed members up to this size are kept in memory until written, larger ones go to temporary files
+SPOOL_SIZE = 8 << 20
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+
+
+@dataclass
+class ArchiveStats:
+    """
+    What an archive run wrote: members compressed, stored and reused from the previous archive, and their sizes.
+    """
+
+    files: int = 0
+    directories: int = 0
+    compressed: int = 0
+    stored: int = 0
+    reused: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    seconds: float = 0.0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+    @property
+    def throughput(self) -> float:
+        """
+        Bytes of files archived per second.
+        """
+        return self.bytes_in / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.files} files ({self.compressed} compressed, {self.stored} stored, {self.reused} reused), "
+                f"{self.bytes_in / 1024 / 1024:.1f} MiB -> {self.bytes_out / 1024 / 1024:.1f} MiB "
+                f"in {self.seconds:.2f}s, {self.throughput / 1024 / 1024:.1f} MiB/s")
+
+
+class _Member(NamedTuple):
+    """
+    A member ready to be written: its info, and either its data or None to copy it from the previous archive.
+    """
+
+    info: zipfile.ZipInfo
+    data: IO[bytes] | None
+    previous: zipfile.ZipInfo | None = None
+
+
+def iter_tree(root: Path, exclude: set[str] = None) -> Iterator[tuple[str, str]]:
+    """
+    (path, name in archive) of the directories and files of a tree, in the order of `shutil.make_archive`:
+    a directory comes before its contents, names are sorted.
+    """
+
+    exclude = exclude or set()
+    root = os.fspath(root)
+
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        relative = os.path.relpath(directory, root)
+
+        for name in subdirectories:
+            path = os.path.join(directory, name)
+            yield path, os.path.normpath(os.path.join(relative, name)) + "/"
+
+        for name in sorted(filenames):
+            path = os.path.join(directory, name)
+
+            if path not in exclude:
+                yield path, os.path.normpath(os.path.join(relative, name))
+
+
+def is_stored(arcname: str) -> bool:
+    return os.path.splitext(arcname)[1].lower() in STORED_SUFFIXES
+
+
+def file_crc(filepath: str) -> int:
+
+    crc = 0
+
+    with open(filepath, "rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            crc = zlib.crc32(chunk, crc)
+
+    return crc
+
+
+def compress_file(filepath: str, info: zipfile.ZipInfo, compresslevel: int = None) -> IO[bytes]:
+    """
+    Read a file into a spooled temporary file, raw-deflated unless `info` says stored, and fill CRC and sizes of `info`.
+    """
+
+    compressor = None
+
+    if info.compress_type == zipfile.ZIP_DEFLATED:
+        level = zlib.Z_DEFAULT_COMPRESSION if compresslevel is None else compresslevel
+        # negative window bits: raw deflate stream, as zip members are written
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+
+    crc = 0
+    size = 0
+    data = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+
+    with open(filepath, "rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            data.write(compressor.compress(chunk) if compressor else chunk)
+
+    if compressor:
+        data.write(compressor.flush())
+
+    info.CRC = crc
+    info.file_size = size
+    info.compress_size = data.tell()
+    data.seek(0)
+
+    return data
+
+
+def dos_date_time(date_time: tuple[int, ...]) -> tuple[int, ...]:
+    """
+    `date_time` as a zip archive keeps it: DOS timestamps count seconds by 2.
+    """
+    return *date_time[:5], date_time[5] // 2 * 2
+
+
+def _prepare_member(filepath: str, arcname: str, previous: zipfile.ZipInfo | None,
+                    compresslevel: int | None, verify_crc: bool) -> _Member:
+
+    info = zipfile.ZipInfo.from_file(filepath, arcname, strict_timestamps=False)
+    info.compress_type = zipfile.ZIP_STORED if is_stored(arcname) else zipfile.ZIP_DEFLATED
+
+    if (previous is not None
+            and previous.file_size == info.file_size
+            and previous.date_time == dos_date_time(info.date_time)
+            and previous.compress_type == info.compress_type
+            and (not verify_crc or file_crc(filepath) == previous.CRC)):
+        info.CRC = previous.CRC
+        info.compress_size = previous.compress_size
+        return _Member(info, None, previous)
+
+    return _Member(info, compress_file(filepath, info, compresslevel))
+
+
+def _copy_raw(source: IO[bytes], previous: zipfile.ZipInfo, destination: IO[bytes]):
+    """
+    Copy the compressed data of a member of another archive as it is.
+    """
+
+    source.seek(previous.header_offset)
+    header = _LOCAL_HEADER.unpack(source.read(_LOCAL_HEADER.size))
+
+    if header[0] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad local header of {previous.filename}.")
+
+    # the local header has its own name and extra field lengths
+    source.seek(header[10] + header[11], 1)
+
+    remaining = previous.compress_size
+
+    while remaining > 0:
+        chunk = source.read(min(CHUNK_SIZE, remaining))
+
+        if not chunk:
+            raise zipfile.BadZipFile(f"{previous.filename} is truncated.")
+
+        destination.write(chunk)
+        remaining -= len(chunk)
+
+
+def _write_member(archive: zipfile.ZipFile, member: _Member, previous_file: IO[bytes] | None):
+    """
+    Write the local header and data of a member whose CRC and sizes are known, bypassing `ZipFile.write`.
+    This does what `ZipFile.write` does around the data with private attributes of `ZipFile`
+    (`_writecheck`, `fp`, `start_dir`, `filelist`, `NameToInfo`, `_didModify`): checked on CPython 3.11 to 3.13,
+    whose `ZipFile.mkdir` the directories need as well. `archive_tree(verify=True)` tests the archive written.
+    """
+
+    info = member.info
+    zip64 = info.file_size > zipfile.ZIP64_LIMIT or info.compress_size > zipfile.ZIP64_LIMIT
+
+    archive._writecheck(info)
+    archive.fp.seek(archive.start_dir)
+    info.header_offset = archive.fp.tell()
+    archive.fp.write(info.FileHeader(zip64))
+
+    if member.data is None:
+        _copy_raw(previous_file, member.previous, archive.fp)
+    else:
+        with member.data:
+            shutil.copyfileobj(member.data, archive.fp, CHUNK_SIZE)
+
+    archive.start_dir = archive.fp.tell()
+    archive.filelist.append(info)
+    archive.NameToInfo[info.filename] = info
+    archive._didModify = True
+
+
+def archive_tree(output_filepath: Path, root: Path, *,
+                 workers: int = None,
+                 compresslevel: int = None,
+                 incremental: bool = False,
+                 verify_crc: bool = True,
+                 verify: bool = False) -> ArchiveStats:
+    """
+    Zip a directory tree, compressing files in a thread pool and storing already compressed media as they are.
+    The archive is written aside and moved into place once complete.
+    @param workers: threads compressing files, default to the number of CPUs
+    @param incremental: reuse the compressed data of members of the existing archive at `output_filepath`
+        whose size and modification time are unchanged
+    @param verify_crc: when reusing, also check the CRC of the file against the one archived
+    @param verify: read the archive written back with `ZipFile.testzip` before moving it into place,
+        raising `zipfile.BadZipFile` and leaving the existing archive as it is when a member is damaged
+    """
+
+    started = time.perf_counter()
+    stats = ArchiveStats()
+
+    output_filepath = Path(output_filepath)
+    temporary_filepath = output_filepath.with_name(f"{output_filepath.name}.tmp")
+    exclude = {os.path.abspath(output_filepath), os.path.abspath(temporary_filepath)}
+
+    previous_archive = None
+
+    if incremental and output_filepath.exists():
+        try:
+            previous_archive = zipfile.ZipFile(output_filepath, "r")
+        except zipfile.BadZipFile:
+            previous_archive = None
+
+    workers = workers or os.cpu_count() or 1
+    pending = deque[Future | zipfile.ZipInfo]()
+
+    try:
+        with (zipfile.ZipFile(temporary_filepath, "w", zipfile.ZIP_DEFLATED) as archive,
+              ThreadPoolExecutor(max_workers=workers) as executor):
+
+            def write_next():
+                task = pending.popleft()
+
+                if isinstance(task, zipfile.ZipInfo):
+                    archive.mkdir(task)
+                    stats.directories += 1
+                    return
+
+                member: _Member = task.result()
+                _write_member(archive, member,
+                              previous_archive.fp if previous_archive is not None else None)
+
+                stats.files += 1
+                stats.bytes_in += member.info.file_size
+
+                if member.data is None:
+                    stats.reused += 1
+                elif member.info.compress_type == zipfile.ZIP_STORED:
+                    stats.stored += 1
+                else:
+                    stats.compressed += 1
+
+            for path, arcname in iter_tree(root, exclude):
+
+                if arcname.endswith("/"):
+                    info = zipfile.ZipInfo.from_file(path, arcname, strict_timestamps=False)
+                    info.CRC = info.compress_size = 0
+                    pending.append(info)
+                else:
+                    previous = previous_archive.NameToInfo.get(arcname) \
+                        if previous_archive is not None else None
+                    pending.append(executor.submit(_prepare_member, path, arcname, previous,
+                                                   compresslevel, verify_crc))
+
+                # members are written in tree order, a bounded number being compressed ahead
+                while len(pending) > workers * 4:
+                    write_next()
+
+            while pending:
+                write_next()
+
+        if verify:
+            with zipfile.ZipFile(temporary_filepath, "r") as written:
+                damaged = written.testzip()
+
+            if damaged is not None:
+                raise zipfile.BadZipFile(f"{damaged} is damaged in the archive of {root}.")
+
+    except BaseException:
+        for task in pending:
+            if isinstance(task, Future):
+                task.cancel()
+
+        temporary_filepath.unlink(missing_ok=True)
+        raise
+
+    finally:
+        if previous_archive is not None:
+            previous_archive.close()
+
+    os.replace(temporary_filepath, output_filepath)
+
+    stats.bytes_out = output_filepath.stat().st_size
+    stats.seconds = time.perf_counter() - started
+
+    return stats
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Duplicated files found by stages: same size, then same head and tail, then same full hash.
+Most files are never read, or read only at both ends.
+"""
+
+if __name__ == "__main__":
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+
+import os
+import queue
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Literal, NamedTuple
+
+from yltoolkit.file_cache import FileStatCache
+from yltoolkit.hashing import DEFAULT_ALGORITHM, Algorithm, Hasher, hash_file
+from yltoolkit.walker import FileEntry
+
+# bytes hashed at each end of a file in the second stage
+DEFAULT_SAMPLE_SIZE = 64 << 10
+
+
+class DuplicateGroup(NamedTuple):
+    """
+    Files with the same contents, sorted by path.
+    """
+
+    size: int
+    digest: str
+    paths: list[Path]
+
+    @property
+    def wasted(self) -> int:
+        """
+        Bytes taken by the copies beyond the first.
+        """
+        return self.size * (len(self.paths) - 1)
+
+
+class DuplicateStats(NamedTuple):
+    """
+    Files seen, and files read at both ends (sampled) or in full (hashed) to tell them apart.
+    """
+
+    files: int
+    sampled: int
+    hashed: int
+    cache_hits: int
+    errors: int
+
+
+def sample_hash(filepath: Path, size: int, algorithm: Algorithm = DEFAULT_ALGORITHM,
+                sample_size: int = DEFAULT_SAMPLE_SIZE) -> str:
+    """
+    Hash of the first and last `sample_size` bytes of a file of `size` bytes; of all its contents if it is no larger than both.
+    """
+
+    hasher = Hasher(algorithm)
+
+    with open(filepath, "rb") as file:
+        if size <= 2 * sample_size:
+            hasher.update(file.read())
+        else:
+            hasher.update(file.read(sample_size))
+            file.seek(-sample_size, os.SEEK_END)
+            hasher.update(file.read(sample_size))
+
+    return hasher.hexdigest()
+
+
+def find_duplicates(entries: Iterable[FileEntry], *,
+                    algorithm: Algorithm = DEFAULT_ALGORITHM,
+                    workers: int = None,
+                    sample_size: int = DEFAULT_SAMPLE_SIZE,
+                    min_size: int = 1,
+                    cache: FileStatCache = None) -> tuple[list[DuplicateGroup], DuplicateStats]:
+    """
+    Groups of files with the same contents, the largest waste first.
+    Hard links to a file already met are left out: they take no space of their own, and files linked by `deduplicate`
+    are not found again.
+    Stages overlap: a file is sampled as soon as another file of its size is met, and fully hashed as soon as
+    another file of its size has the same sample, while `entries` are still being walked.
+    @param entries: files with their stat data, e.g. from `walker.walk_files`
+    @param min_size: smaller files are left out, empty ones by default
+    @param cache: full hashes of files unchanged since they were cached are not computed again, see `get_file_hashes`
+    """
+
+    # stage results come back through a queue, handled in this thread only
+    results = queue.SimpleQueue()
+    outstanding = 0
+
+    by_size = defaultdict[int, list[Path]](list)
+    by_sample = defaultdict[tuple[int, str], list[Path]](list)
+    by_hash = defaultdict[tuple[int, str], list[Path]](list)
+
+    # (device, inode) of the files met
+    file_ids = set[tuple[int, int]]()
+
+    files = sampled = hashed = cache_hits = errors = 0
+    new_cache_entries = list[tuple[Path, str, os.stat_result]]()
+
+    def sample(path: Path, size: int):
+        return "sample", path, size, sample_hash(path, size, algorithm, sample_size), None
+
+    def full_hash(path: Path, size: int):
+        stat = os.stat(path)
+        digest = cache.get(path, algorithm, stat) if cache is not None else None
+
+        if digest is not None:
+            return "cached", path, size, digest, None
+
+        return "hash", path, size, hash_file(path, algorithm), stat
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def submit(function: Callable, path: Path, size: int):
+            nonlocal outstanding
+            outstanding += 1
+
+            future = executor.submit(function, path, size)
+            future.add_done_callback(results.put)
+
+        def handle(future):
+            nonlocal outstanding, sampled, hashed, cache_hits, errors
+            outstanding -= 1
+
+            try:
+                stage, path, size, digest, stat = future.result()
+            except OSError:
+                # removed or unreadable since listed
+                errors += 1
+                return
+
+            if stage == "sample":
+                sampled += 1
+
+                if size <= 2 * sample_size:
+                    # the sample covered the whole file
+                    by_hash[size, digest].append(path)
+                    return
+
+                group = by_sample[size, digest]
+                group.append(path)
+
+                if len(group) == 2:
+                    submit(full_hash, group[0], size)
+                if len(group) >= 2:
+                    submit(full_hash, path, size)
+
+                return
+
+            if stage == "cached":
+                cache_hits += 1
+            else:
+                hashed += 1
+
+                if cache is not None:
+                    new_cache_entries.append((path, digest, stat))
+
+                    if len(new_cache_entries) >= 256:
+                        cache.set_many(new_cache_entries, algorithm)
+                        new_cache_entries.clear()
+
+            by_hash[size, digest].append(path)
+
+        for entry in entries:
+            files += 1
+
+            if entry.size < min_size:
+                continue
+
+            if entry.inode:
+                if (entry.dev, entry.inode) in file_ids:
+                    continue
+
+                file_ids.add((entry.dev, entry.inode))
+
+            group = by_size[entry.size]
+            group.append(entry.path)
+
+            if len(group) == 2:
+                submit(sample, group[0], entry.size)
+            if len(group) >= 2:
+                submit(sample, entry.path, entry.size)
+
+            while not results.empty():
+                handle(results.get())
+
+        while outstanding:
+            handle(results.get())
+
+    if cache is not None and new_cache_entries:
+        cache.set_many(new_cache_entries, algorithm)
+
+    groups = [DuplicateGroup(size, digest, sorted(paths))
+              for (size, digest), paths in by_hash.items() if len(paths) > 1]
+    groups.sort(key=lambda group: (-group.wasted, group.paths[0]))
+
+    return groups, DuplicateStats(files, sampled, hashed, cache_hits, errors)
+
+
+class DeduplicationResult(NamedTuple):
+    """
+    A duplicate replaced by a hard link to the kept file, or deleted; `error` is set when it failed.
+    """
+
+    path: Path
+    kept: Path
+    error: OSError | None = None
+
+
+def keep_first(paths: list[Path]) -> Path:
+    return paths[0]
+
+
+def deduplicate(groups: Iterable[DuplicateGroup], action: Literal["hardlink", "delete"], *,
+                keep: Callable[[list[Path]], Path] = keep_first) -> list[DeduplicationResult]:
+    """
+    Replace the duplicates of each group with hard links to the file kept, or delete them.
+    A file whose size changed since it was found is left as it is.
+    @param keep: choose the file kept of a group, the first by path by default
+    """
+
+    if action not in ("hardlink", "delete"):
+        raise NotImplementedError(f"Deduplication action {action} is not supported.")
+
+    results = list[DeduplicationResult]()
+
+    for group in groups:
+        kept = keep(group.paths)
+
+        for path in group.paths:
+            if path == kept:
+                continue
+
+            try:
+                if path.stat().st_size != group.size or kept.stat().st_size != group.size:
+                    raise OSError(f"{path} or {kept} changed since duplicates were found.")
+
+                if os.path.samefile(path, kept):
+                    # already linked
+                    continue
+
+                match action:
+                    case "hardlink":
+                        # linked aside then renamed over: the duplicate is never missing
+                        temporary_path = path.with_name(f".{path.name}.link")
+                        os.link(kept, temporary_path)
+
+                        try:
+                            os.replace(temporary_path, path)
+                        except OSError:
+                            temporary_path.unlink()
+                            raise
+                    case "delete":
+                        path.unlink()
+
+                results.append(DeduplicationResult(path, kept))
+
+            except OSError as error:
+                results.append(DeduplicationResult(path, kept, error))
+
+    return results
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Minimal EXIF reader of JPEG and TIFF files, reading only the metadata bytes.
+EXIF Tags code: https://exiv2.org/tags.html
+"""
+
+if __name__ == "__main__":
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+
+import struct
+from pathlib import Path
+from typing import BinaryIO, Callable
+
+EXIF_IMAGE_DATETIME = 306
+EXIF_IMAGE_DATETIMEORIGINAL = 36867
+EXIF_IFD_POINTER = 0x8769
+
+TIFF_ASCII = 2
+TIFF_SHORT = 3
+
+JPEG_SOI = b"\xff\xd8"
+JPEG_APP1 = 0xE1
+JPEG_SOS = 0xDA
+JPEG_EOI = 0xD9
+EXIF_HEADER = b"Exif\x00\x00"
+
+# bound the entries read from a damaged IFD
+MAX_IFD_ENTRIES = 1024
+
+
+class ExifFormatError(ValueError):
+    """
+    The file is not a JPEG or TIFF file this reader understands.
+    """
+
+
+def read_exif_datetime_string(filepath: Path) -> str | None:
+    """
+    `DateTimeOriginal` of the Exif IFD, or else `DateTime` of IFD0, as written in the file; None when neither is set.
+    Raise `ExifFormatError` for files other than JPEG and TIFF, or too damaged to be read.
+    """
+
+    with open(filepath, "rb") as file:
+        head = file.read(4)
+
+        try:
+            if head[:2] == JPEG_SOI:
+                tiff = _read_jpeg_exif(file)
+
+                if tiff is None:
+                    return None
+
+                return _read_tiff_datetime(lambda offset, size: tiff[offset: offset + size])
+
+            if head in (b"II*\x00", b"MM\x00*"):
+                def read(offset: int, size: int) -> bytes:
+                    file.seek(offset)
+                    return file.read(size)
+
+                return _read_tiff_datetime(read)
+
+        except struct.error as error:
+            raise ExifFormatError(f"{filepath} is truncated.") from error
+
+    raise ExifFormatError(f"{filepath} is neither a JPEG nor a TIFF file.")
+
+
+def _read_jpeg_exif(file: BinaryIO) -> bytes | None:
+    """
+    TIFF data of the EXIF APP1 segment, the file being positioned after the 2 bytes of SOI.
+    """
+
+    file.seek(2)
+
+    while True:
+        marker = file.read(2)
+
+        if len(marker) < 2 or marker[0] != 0xFF:
+            raise ExifFormatError("Broken JPEG marker.")
+
+        # fill bytes before a marker
+        while marker[1] == 0xFF:
+            byte = file.read(1)
+
+            if not byte:
+                raise ExifFormatError("JPEG is truncated.")
+
+            marker = marker[1:] + byte
+
+        code = marker[1]
+
+        if code in (JPEG_SOS, JPEG_EOI):
+            # metadata segments come before the image data
+            return None
+
+        (length,) = struct.unpack(">H", file.read(2))
+
+        if code == JPEG_APP1:
+            segment = file.read(length - 2)
+
+            if segment.startswith(EXIF_HEADER):
+                return segment[len(EXIF_HEADER):]
+        else:
+            file.seek(length - 2, 1)
+
+
+def _read_tiff_datetime(read: Callable[[int, int], bytes]) -> str | None:
+
+    header = read(0, 8)
+
+    if len(header) < 8:
+        raise ExifFormatError("Broken TIFF header.")
+
+    byteorder = {b"II": "<", b"MM": ">"}.get(header[:2])
+
+    if byteorder is None:
+        raise ExifFormatError("Unknown TIFF byte order.")
+
+    (ifd0_offset,) = struct.unpack(f"{byteorder}I", header[4:8])
+    ifd0 = _read_ifd(read, byteorder, ifd0_offset)
+
+    exif_ifd_entry = ifd0.get(EXIF_IFD_POINTER)
+
+    if exif_ifd_entry is not None:
+        exif_ifd = _read_ifd(read, byteorder, _unpack_offset(byteorder, exif_ifd_entry))
+
+        if EXIF_IMAGE_DATETIMEORIGINAL in exif_ifd:
+            return _read_ascii(read, byteorder, exif_ifd[EXIF_IMAGE_DATETIMEORIGINAL])
+
+    if EXIF_IMAGE_DATETIMEORIGINAL in ifd0:
+        return _read_ascii(read, byteorder, ifd0[EXIF_IMAGE_DATETIMEORIGINAL])
+
+    if EXIF_IMAGE_DATETIME in ifd0:
+        return _read_ascii(read, byteorder, ifd0[EXIF_IMAGE_DATETIME])
+
+    return None
+
+
+def _read_ifd(read: Callable[[int, int], bytes], byteorder: str, offset: int) -> dict[int, tuple[int, int, bytes]]:
+    """
+    Entries of an IFD: tag -> (type, count, value or offset bytes).
+    """
+
+    count_bytes = read(offset, 2)
+
+    if len(count_bytes) < 2:
+        raise ExifFormatError("IFD out of the file.")
+
+    (count,) = struct.unpack(f"{byteorder}H", count_bytes)
+    count = min(count, MAX_IFD_ENTRIES)
+
+    data = read(offset + 2, count * 12)
+    entries = dict[int, tuple[int, int, bytes]]()
+
+    for start in range(0, len(data) - 11, 12):
+        tag, field_type, value_count = struct.unpack(
+            f"{byteorder}HHI", data[start: start + 8])
+        entries[tag] = (field_type, value_count, data[start + 8: start + 12])
+
+    return entries
+
+
+def _unpack_offset(byteorder: str, entry: tuple[int, int, bytes]) -> int:
+
+    field_type, _, value = entry
+
+    # LONG or IFD usually, some writers use SHORT
+    if field_type == TIFF_SHORT:
+        return struct.unpack(f"{byteorder}H", value[:2])[0]
+
+    return struct.unpack(f"{byteorder}I", value)[0]
+
+
+def _read_ascii(read: Callable[[int, int], bytes], byteorder: str, entry: tuple[int, int, bytes]) -> str | None:
+
+    field_type, count, value = entry
+
+    if field_type != TIFF_ASCII:
+        return None
+
+    if count > 4:
+        (offset,) = struct.unpack(f"{byteorder}I", value)
+        value = read(offset, count)
+    else:
+        value = value[:count]
+
+    text = value.split(b"\x00", 1)[0].decode("ascii", errors="replace").strip()
+
+    return text or None
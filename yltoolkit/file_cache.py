@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Persistent cache of values computed from file contents.
+"""
+
+if __name__ == "__main__":
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Self
+
+
+class FileStatCache:
+    """
+    Values (e.g. hashes) of files kept in an SQLite database, keyed by namespace and absolute path.
+    A value is valid while the size, `st_mtime_ns` and inode of its file are unchanged: a file is never re-read
+    unless it was modified or replaced.
+    Counts of valid (`hits`) and missing or stale (`misses`) lookups are kept since the cache was opened.
+    """
+
+    def __init__(self, filepath: Path) -> None:
+
+        self.filepath = filepath
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(filepath, check_same_thread=False)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                value TEXT,
+                PRIMARY KEY (namespace, path)
+            )""")
+        self._connection.commit()
+
+    @staticmethod
+    def stat_key(stat: os.stat_result) -> tuple[int, int, int]:
+        return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+    def get(self, filepath: Path, namespace: str, stat: os.stat_result = None) -> str | None:
+        """
+        Cached value of `filepath`, or None if there is none or the file changed since.
+        @param stat: result of `os.stat(filepath)` when it is at hand
+        """
+
+        stat = os.stat(filepath) if stat is None else stat
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT size, mtime_ns, inode, value FROM entries WHERE namespace = ? AND path = ?",
+                (namespace, os.path.abspath(filepath))).fetchone()
+
+            if row is not None and tuple(row[:3]) == self.stat_key(stat):
+                self.hits += 1
+                return row[3]
+
+            self.misses += 1
+            return None
+
+    def set(self, filepath: Path, namespace: str, value: str, stat: os.stat_result = None):
+        """
+        Cache the value of `filepath`, `stat` being taken before the value was computed.
+        """
+        self.set_many([(filepath, value, stat)], namespace)
+
+    def set_many(self, entries: list[tuple[Path, str, os.stat_result | None]], namespace: str):
+
+        rows = [(namespace, os.path.abspath(filepath),
+                 *self.stat_key(os.stat(filepath) if stat is None else stat), value)
+                for filepath, value, stat in entries]
+
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO entries (namespace, path, size, mtime_ns, inode, value) VALUES (?, ?, ?, ?, ?, ?)",
+                rows)
+            self._connection.commit()
+
+    def discard(self, filepath: Path, namespace: str = None):
+
+        with self._lock:
+            if namespace is None:
+                self._connection.execute(
+                    "DELETE FROM entries WHERE path = ?", (os.path.abspath(filepath),))
+            else:
+                self._connection.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND path = ?", (namespace, os.path.abspath(filepath)))
+
+            self._connection.commit()
+
+    def prune(self) -> int:
+        """
+        Drop the entries of files that no longer exist, return how many were dropped.
+        """
+
+        with self._lock:
+            paths = [path for (path,) in self._connection.execute("SELECT DISTINCT path FROM entries")
+                     if not os.path.exists(path)]
+
+            self._connection.executemany(
+                "DELETE FROM entries WHERE path = ?", [(path,) for path in paths])
+            self._connection.commit()
+
+        return len(paths)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -13,52 +13,144 @@ if __name__ == "__main__":
     sys.path.insert(0, abspath(join(dirname(__file__), "..")))
 
 
+import bz2
 import csv
-import hashlib
-import shutil
-from functools import reduce
+import gzip
+import io
+import json
+import lzma
+import mmap
+import operator
+import os
+import pickle
+import re
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain, islice
 from pathlib import Path
-from typing import Any, Callable, Literal
+from typing import IO, Any, Callable, Iterable, Iterator, Literal
+
+from yltoolkit.archiver import ArchiveStats, archive_tree
+from yltoolkit.duplicates import DuplicateGroup, deduplicate, find_duplicates
+from yltoolkit.exif import (EXIF_IFD_POINTER, EXIF_IMAGE_DATETIME, EXIF_IMAGE_DATETIMEORIGINAL, ExifFormatError,
+                            read_exif_datetime_string)
+from yltoolkit.file_cache import FileStatCache
+from yltoolkit.hashing import DEFAULT_ALGORITHM, DEFAULT_CHUNK_SIZE, Algorithm, hash_file
+from yltoolkit.logger import logger
+from yltoolkit.transfer import TransferResult, TransferStatus, copy_file, move_file, transfer_pairs
+from yltoolkit.walker import walk_files
+from yltoolkit.YLDatetime import TimeStandard, YLDatetime
 
-from PIL import Image
+# predicate of a raw CSV value (None when the row is short), or value it must equal
+RowTest = Callable[[str | None], bool] | str | None
 
-from yltoolkit.YLDatetime import TimeStandard, YLDatetime
+# compression suffix -> opener of binary streams, taking a compression level (or preset) or None for the default
+COMPRESSIONS: dict[str, Callable[[Path, str, int | None], IO[bytes]]] = {
+    ".gz": lambda filepath, mode, level: gzip.GzipFile(filepath, mode, **({} if level is None else {"compresslevel": level})),
+    ".bz2": lambda filepath, mode, level: bz2.BZ2File(filepath, mode, **({} if level is None else {"compresslevel": level})),
+    ".xz": lambda filepath, mode, level: lzma.LZMAFile(filepath, mode, preset=level),
+}
 
+# buffer of compressed streams, large enough to amortize the calls into the codecs
+COMPRESSED_BUFFER_SIZE = 1 << 20
 
-def read_csv(filepath: Path, *,
+
+def get_compression(filepath: Path) -> str | None:
+    """
+    Compression suffix of a file (e.g. `.gz` of `items.csv.gz`), if it is one of `COMPRESSIONS`.
+    """
+
+    suffix = Path(filepath).suffix.lower()
+    return suffix if suffix in COMPRESSIONS else None
+
+
+def strip_compression(filepath: Path) -> Path:
+    """
+    `items.csv` of `items.csv.gz`, the file path itself when it has no compression suffix.
+    """
+
+    filepath = Path(filepath)
+    return filepath.with_suffix("") if get_compression(filepath) is not None else filepath
+
+
+def open_file(filepath: Path, mode: str = "r", *,
+              encoding: str = None,
+              newline: str = None,
+              compresslevel: int = None,
+              buffer_size: int = None
+              ) -> IO:
+    """
+    `open` streaming through gzip, bz2 or lzma for files with a `COMPRESSIONS` suffix.
+    @param compresslevel: level (gzip, bz2) or preset (xz) of files written, the codec default if None
+    @param buffer_size: buffer of the file, `COMPRESSED_BUFFER_SIZE` for compressed files if None
+    """
+
+    compression = get_compression(filepath)
+
+    if compression is None:
+        return open(filepath, mode,
+                    buffering=-1 if buffer_size is None else buffer_size,
+                    encoding=encoding, newline=newline)
+
+    binary_mode = mode.replace("t", "").replace("b", "") + "b"
+    stream = COMPRESSIONS[compression](filepath, binary_mode, compresslevel)
+
+    buffer_size = COMPRESSED_BUFFER_SIZE if buffer_size is None else buffer_size
+
+    if buffer_size > 0:
+        buffered_type = io.BufferedReader if binary_mode == "rb" else io.BufferedWriter
+        stream = buffered_type(stream, buffer_size)
+
+    if "b" in mode:
+        return stream
+
+    return io.TextIOWrapper(stream, encoding=encoding, newline=newline)
+
+
+def iter_csv(filepath: Path, *,
              fieldnames_recognizer: dict[str, str] = None,
              fieldnames_handler: Callable[[list[str]],
                                           list[str]] = None,
              pairing_handler: Callable[[list[str], list[str]],
                                        dict[str, Any]] = None,
-             mapping_handler: Callable[[dict[str, Any]], None]
-             ):
+             columns: Iterable[str] = None,
+             where: dict[str, RowTest] = None,
+             buffer_size: int = None
+             ) -> Iterator[dict[str, Any]]:
     """
-    CSV file read in as a dictionary.
+    CSV file read in as dictionaries, one row at a time.
     @param fieldnames_recognizer: dict[str, str]
     @param fieldnames_handler: (fieldnames: list[str]) -> list[str]
     @param pairing_handler: (fieldnames: list[str], values: list[str]) -> dict[str, Any]
-    @param mapping_handler: (mapping: dict[str, Any]) -> None
+    @param columns: field names to keep, in this order
+    @param where: field name -> predicate of the raw value, or value it must equal (see `compile_row_filter`)
     fieldnames_recognizer first, and then fieldnames_handler
+    `columns` and `where` refer to the field names handled, and apply to raw rows before any dictionary is made.
+    Compressed files are read through their codecs, see `open_file`.
     """
 
+    projected = columns is not None or where is not None
+
     if fieldnames_recognizer is None  \
             and fieldnames_handler is None   \
-            and pairing_handler is None:
+            and pairing_handler is None \
+            and not projected:
 
         # simple csv dict reader
-        with open(filepath, "r", encoding="utf-8-sig", newline="") as file:
+        with open_file(filepath, "r", encoding="utf-8-sig", newline="", buffer_size=buffer_size) as file:
 
             reader = csv.DictReader(file)
 
             for row in reader:
 
                 row.pop("", None)  # remove empty key-value pairs
-                mapping_handler(row)
+                yield row
 
     else:
         # use reader and customize reading handlers
-        with open(filepath, "r", encoding="utf-8-sig", newline="") as file:
+        with open_file(filepath, "r", encoding="utf-8-sig", newline="", buffer_size=buffer_size) as file:
 
             reader = csv.reader(file)
 
@@ -72,15 +164,221 @@ def read_csv(filepath: Path, *,
             if fieldnames_handler is not None:
                 fieldnames = fieldnames_handler(fieldnames)
 
+            if projected:
+                matches = compile_row_filter(fieldnames, where) \
+                    if where else None
+                selected = column_indexes(fieldnames, columns) \
+                    if columns is not None else list(enumerate(fieldnames))
+
+                names = [name for _, name in selected]
+                project = row_projector([index for index, _ in selected])
+
             for row in reader:
 
+                if projected:
+                    # blank lines are skipped as by `csv.DictReader`
+                    if not row or matches is not None and not matches(row):
+                        continue
+
+                    row_names, row = names, project(row)
+                else:
+                    row_names = fieldnames
+
                 if pairing_handler is not None:
-                    mapping = pairing_handler(fieldnames, row)
+                    mapping = pairing_handler(row_names, row)
                 else:
-                    mapping = dict(zip(fieldnames, row))
+                    mapping = dict(zip(row_names, row))
 
                 mapping.pop("", None)  # remove empty key-value pairs
-                mapping_handler(mapping)
+                yield mapping
+
+
+def column_indexes(fieldnames: list[str], columns: Iterable[str]) -> list[tuple[int, str]]:
+    """
+    `(index, name)` of each of `columns` in `fieldnames`, the last one of duplicated field names as in `csv.DictReader`.
+    """
+
+    columns = list(columns)
+    indexes = {name: index for index, name in enumerate(fieldnames)}
+    missing = [name for name in columns if name not in indexes]
+
+    if missing:
+        raise ValueError(
+            f"Columns {', '.join(missing)} are not in the field names.")
+
+    return [(indexes[name], name) for name in columns]
+
+
+def compile_row_filter(fieldnames: list[str], where: dict[str, RowTest]) -> Callable[[list[str]], bool]:
+    """
+    Test of raw rows: whether every field named in `where` passes its predicate, or equals its value.
+    """
+
+    tests = list[tuple[int, Callable[[str | None], bool]]]()
+
+    for index, name in column_indexes(fieldnames, list(where)):
+        test = where[name]
+
+        if not callable(test):
+            test = partial(operator.eq, test)
+
+        tests.append((index, test))
+
+    def matches(row: list[str]) -> bool:
+
+        count = len(row)
+
+        for index, test in tests:
+            if not test(row[index] if index < count else None):
+                return False
+
+        return True
+
+    return matches
+
+
+def row_projector(indexes: list[int]) -> Callable[[list[str]], list[str | None]]:
+    """
+    Values of raw rows at `indexes`, None for those past the end of short rows.
+    """
+
+    width = max(indexes, default=-1) + 1
+
+    def project(row: list[str]) -> list[str | None]:
+
+        if len(row) < width:
+            row = row + [None] * (width - len(row))
+
+        return [row[index] for index in indexes]
+
+    return project
+
+
+# a run of complete CSV values from a record start: unquoted text, values quoted from the start of a field to their
+# closing quote (`""` being an escaped quote), and quotes inside unquoted values, which `csv` keeps as they are
+CSV_COMPLETE_VALUES = re.compile(rb'''(?:[^"]++|(?<![^,\r\n])"(?:[^"]++|"")*+"|(?<=[^,\r\n])")*+''')
+CSV_QUOTED_VALUE = re.compile(rb'''"(?:[^"]++|"")*+"''')
+
+
+def split_csv(filepath: Path, parts: int, *, min_part_size: int = 1 << 20) -> tuple[list[str], list[tuple[int, int]]]:
+    """
+    Split a UTF-8 CSV file into at most `parts` byte ranges, each starting and ending on a record boundary.
+    Newlines inside quoted values are not boundaries: the file is scanned once, a quote opening a quoted value only at
+    the start of a field, as `csv` reads it. A quoted value left open runs to the end of the file, the last range.
+    Return the field names and the `(start, end)` byte ranges of the records after them.
+    Compressed files have no byte ranges to be read from: they are not supported.
+    """
+
+    if get_compression(filepath) is not None:
+        raise NotImplementedError(f"Compressed file {filepath} cannot be split.")
+
+    file_size = Path(filepath).stat().st_size
+
+    if file_size == 0:
+        return [], []
+
+    with open(filepath, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+
+        scanned = 0     # an offset outside quoted values, every value quoted before it being closed
+
+        def record_end(target: int) -> int | None:
+            # offset after the first newline outside quoted values at or after `target`
+            nonlocal scanned
+
+            index = data.find(b"\n", max(target, scanned))
+
+            while index != -1:
+                complete = CSV_COMPLETE_VALUES.match(data, scanned, index + 1).end()
+
+                if complete == index + 1:
+                    scanned = index + 1
+                    return scanned
+
+                # a value quoted before the newline is still open there
+                quoted = CSV_QUOTED_VALUE.match(data, complete)
+
+                if quoted is None:
+                    logger.warning(
+                        f"Quoted value left open at byte {complete} of {filepath}, read to the end of the file.")
+                    return None
+
+                scanned = quoted.end()
+                index = data.find(b"\n", max(target, scanned))
+
+            return None
+
+        data_start = record_end(0)
+
+        if data_start is None:
+            # header only
+            data_start = file_size
+
+        header = data[:data_start]
+        fieldnames = next(csv.reader(io.StringIO(header.decode("utf-8-sig"), newline="")), [])
+
+        part_size = max((file_size - data_start) // max(parts, 1) + 1,
+                        min_part_size)
+
+        ranges = list[tuple[int, int]]()
+        start = data_start
+
+        while start < file_size:
+            end = record_end(start + part_size)
+            end = file_size if end is None else end
+
+            ranges.append((start, end))
+            start = end
+
+    return fieldnames, ranges
+
+
+def iter_csv_rows(filepath: Path, start: int = None, end: int = None, *, buffer_size: int = None) -> Iterator[list[str]]:
+    """
+    Records of a CSV file as lists of strings, blank lines skipped.
+    Without `start` and `end` the whole file is read, field names first, compressed files through their codecs;
+    otherwise the records of an uncompressed UTF-8 file between these byte offsets (see `split_csv`).
+    """
+
+    if start is None and end is None:
+        with open_file(filepath, "r", encoding="utf-8-sig", newline="", buffer_size=buffer_size) as file:
+            yield from filter(None, csv.reader(file))
+
+        return
+
+    with open(filepath, "rb") as file:
+        file.seek(start or 0)
+        text = file.read(-1 if end is None else end - (start or 0)).decode("utf-8")
+
+    yield from filter(None, csv.reader(io.StringIO(text, newline="")))
+
+
+def read_csv(filepath: Path, *,
+             fieldnames_recognizer: dict[str, str] = None,
+             fieldnames_handler: Callable[[list[str]],
+                                          list[str]] = None,
+             pairing_handler: Callable[[list[str], list[str]],
+                                       dict[str, Any]] = None,
+             mapping_handler: Callable[[dict[str, Any]], None],
+             columns: Iterable[str] = None,
+             where: dict[str, RowTest] = None
+             ):
+    """
+    CSV file read in as a dictionary.
+    @param fieldnames_recognizer: dict[str, str]
+    @param fieldnames_handler: (fieldnames: list[str]) -> list[str]
+    @param pairing_handler: (fieldnames: list[str], values: list[str]) -> dict[str, Any]
+    @param mapping_handler: (mapping: dict[str, Any]) -> None
+    @param columns, where: see `iter_csv`
+    fieldnames_recognizer first, and then fieldnames_handler
+    """
+
+    for mapping in iter_csv(filepath,
+                            fieldnames_recognizer=fieldnames_recognizer,
+                            fieldnames_handler=fieldnames_handler,
+                            pairing_handler=pairing_handler,
+                            columns=columns,
+                            where=where):
+        mapping_handler(mapping)
 
 
 def read_csv_to_list(filepath: Path, *,
@@ -88,14 +386,18 @@ def read_csv_to_list(filepath: Path, *,
                      fieldnames_handler: Callable[[list[str]],
                                                   list[str]] = None,
                      pairing_handler: Callable[[list[str], list[str]],
-                                               dict[str, Any]] = None) -> list[dict[str, Any]]:
+                                               dict[str, Any]] = None,
+                     columns: Iterable[str] = None,
+                     where: dict[str, RowTest] = None) -> list[dict[str, Any]]:
     result = list[dict[str, Any]]()
 
     read_csv(filepath=filepath,
              fieldnames_recognizer=fieldnames_recognizer,
              fieldnames_handler=fieldnames_handler,
              pairing_handler=pairing_handler,
-             mapping_handler=lambda mapping: result.append(mapping)
+             mapping_handler=lambda mapping: result.append(mapping),
+             columns=columns,
+             where=where
              )
 
     return result
@@ -166,30 +468,37 @@ def read_csv_with_duplicated_fieldnames(filepath: Path, *, fieldnames_recognizer
     return result
 
 
-def write_csv(items: list[dict[str, str]],
+def write_csv(items: Iterable[dict[str, Any]],
               filepath: Path, *,
               fieldnames: list[str] = None,
-              fieldnames_adapter: dict[str, str] = None
+              fieldnames_adapter: dict[str, str] = None,
+              fieldnames_source: Literal["auto", "sample", "spill"] = "auto",
+              sample_size: int = 1000,
+              compresslevel: int = None,
+              buffer_size: int = None
               ):
     """
-    Write a dictionary into a CSV file.
+    Write dictionaries into a CSV file, one at a time: `items` may be any iterable, e.g. a generator.
     @param fieldnames_adapter: dict[str, str]
+    @param fieldnames_source: where field names come from when `fieldnames` is None (see `iter_with_fieldnames`)
+    @param compresslevel, buffer_size: see `open_file`, files with a compression suffix are compressed
     fieldnames_recognizer first, and then fieldnames_handler
     """
 
     if fieldnames is None:
-        fieldnames: list[str] = reduce(lambda x, y: x | y, items).keys()
+        fieldnames, items = iter_with_fieldnames(items,
+                                                 source=fieldnames_source,
+                                                 sample_size=sample_size)
 
     if fieldnames_adapter is None:
         # simple csv dict reader
-        with open(filepath, "w", encoding="utf-8-sig", newline="") as file:
+        with open_file(filepath, "w", encoding="utf-8-sig", newline="",
+                       compresslevel=compresslevel, buffer_size=buffer_size) as file:
 
             writer = csv.DictWriter(file, fieldnames=fieldnames)
 
             writer.writeheader()
-
-            for item in items:
-                writer.writerow(item)
+            writer.writerows(items)
 
     else:
         # use reader and customize reading handlers
@@ -198,7 +507,8 @@ def write_csv(items: list[dict[str, str]],
             adapted_fieldnames = [fieldnames_adapter.get(name, name)
                                   for name in fieldnames]
 
-        with open(filepath, "w", encoding="utf-8-sig", newline="") as file:
+        with open_file(filepath, "w", encoding="utf-8-sig", newline="",
+                       compresslevel=compresslevel, buffer_size=buffer_size) as file:
 
             writer = csv.writer(file)
 
@@ -209,6 +519,147 @@ def write_csv(items: list[dict[str, str]],
                 writer.writerow(row)
 
 
+def iter_with_fieldnames(items: Iterable[dict[str, Any]], *,
+                         source: Literal["auto", "sample", "spill"] = "auto",
+                         sample_size: int = 1000
+                         ) -> tuple[list[str], Iterable[dict[str, Any]]]:
+    """
+    Keys of all the items in order of appearance, and the items to be iterated over (once) afterwards.
+    @param source:
+        "sample": keys of the first `sample_size` items only, a later item with another key cannot be written;
+        "spill": keys of all the items, spilled into a temporary file while their keys are collected and read back lazily;
+        "auto": keys of all the items of a list or tuple, collected without copying it, or else "spill"
+    """
+
+    if source == "auto":
+        if isinstance(items, (list, tuple)):
+            fieldnames = dict[str, None]()
+
+            for item in items:
+                fieldnames.update(dict.fromkeys(item))
+
+            return list(fieldnames), items
+
+        source = "spill"
+
+    items = iter(items)
+    fieldnames = dict[str, None]()
+
+    match source:
+        case "sample":
+            sample = list(islice(items, sample_size))
+
+            for item in sample:
+                fieldnames.update(dict.fromkeys(item))
+
+            return list(fieldnames), chain(sample, items)
+
+        case "spill":
+            file = tempfile.TemporaryFile()
+
+            try:
+                pickler = pickle.Pickler(file, protocol=pickle.HIGHEST_PROTOCOL)
+
+                for item in items:
+                    fieldnames.update(dict.fromkeys(item))
+
+                    pickler.dump(item)
+                    # items are not kept alive by the memo
+                    pickler.clear_memo()
+
+                file.seek(0)
+
+            except BaseException:
+                file.close()
+                raise
+
+            return list(fieldnames), _iter_spilled(file)
+
+        case _:
+            raise ValueError(f"Unknown field names source {source}.")
+
+
+def _iter_spilled(file: IO[bytes]) -> Iterator[Any]:
+
+    with file:
+        while True:
+            try:
+                # an unpickler per item, one kept along would memoize every item
+                yield pickle.load(file)
+            except EOFError:
+                return
+
+
+def iter_json_list(filepath: Path, *, encoding: str = "utf-8", chunk_size: int = 1 << 20, buffer_size: int = None) -> Iterator[Any]:
+    """
+    Items of a JSON file whose top level is a list, parsed one at a time.
+    Only the item being parsed and one chunk of text are held in memory. Compressed files are read through their codecs.
+    """
+
+    decoder = json.JSONDecoder()
+    separator_pattern = re.compile(r"\s*[,\]]")
+
+    with open_file(filepath, "r", encoding=encoding, newline="", buffer_size=buffer_size) as file:
+
+        buffer = ""
+        position = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buffer, position, eof
+
+            chunk = file.read(chunk_size)
+            buffer = buffer[position:] + chunk
+            position = 0
+            eof = chunk == ""
+
+            return not eof
+
+        def skip(characters: str) -> str | None:
+            # skip whitespace and separators, return the next meaningful character
+            nonlocal position
+
+            while True:
+                while position < len(buffer) and buffer[position] in characters:
+                    position += 1
+
+                if position < len(buffer):
+                    return buffer[position]
+
+                if not fill():
+                    return None
+
+        if skip(" \t\r\n\ufeff") != "[":
+            raise ValueError(f"{filepath} is not a JSON list.")
+        position += 1
+
+        while True:
+            character = skip(" \t\r\n,")
+
+            if character is None:
+                raise ValueError(f"{filepath} ends before the JSON list does.")
+
+            if character == "]":
+                return
+
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if fill():
+                        continue
+                    raise
+
+                # a number may continue in the next chunk, so the item must be followed by a separator
+                if not eof and separator_pattern.match(buffer, end) is None and fill():
+                    continue
+
+                break
+
+            position = end
+            yield item
+
+
 def ensure_directory(path: Path):
     """
     Create a directory if it doesn't exist.
@@ -219,30 +670,81 @@ def ensure_directory(path: Path):
 
 
 def map_files_in_directory(directory: Path) -> dict[str, Path]:
+    """
+    Files with a dot in their names in a directory tree, keyed by name: of files with the same name, the last one met is kept.
+    Linked files are listed, linked directories are not walked into, as by `Path.glob("**/*.*")`.
+    See `walker.walk_files` for all the files, with their stat data.
+    """
+
+    result = dict[str, Path]()
+
+    for entry in walk_files(directory, follow_symlinks="files"):
+        name = entry.name
+
+        if "." not in name:
+            continue
 
-    return {filepath.name: filepath
-            for filepath in directory.glob("**/*.*")
-            if filepath.is_file()}
+        if name in result:
+            logger.warning(
+                f"{entry.path} replaces {result[name]} with the same name in the files of {directory}.")
+
+        result[name] = entry.path
+
+    return result
 
 
 def copy_and_paste(source: Path, destination: Path):
     if destination.exists():
         raise FileExistsError
 
-    shutil.copy(source, destination)
+    copy_file(source, destination)
 
 
 def move(source: Path, destination: Path):
-    source.rename(destination)
+    # renamed, or copied then deleted across filesystems
+    move_file(source, destination)
+
+
+def transfer_files(pairs: Iterable[tuple[Path, Path]], mode: Literal["copy", "move"] = "copy", *,
+                   workers: int = None,
+                   overwrite: bool = False,
+                   skip_identical: bool = False,
+                   algorithm: Algorithm = DEFAULT_ALGORITHM) -> list[TransferResult]:
+    """
+    Copy or move (source, destination) pairs concurrently, see `transfer_pairs`.
+    Every pair gets a result, in order: conflicts and failures are reported rather than raised.
+    """
+
+    results = transfer_pairs(pairs, mode, workers=workers, overwrite=overwrite,
+                             skip_identical=skip_identical, algorithm=algorithm)
+
+    counts = Counter(result.status for result in results)
+    size = sum(result.size for result in results if result.status != TransferStatus.SKIPPED)
+
+    logger.success(
+        f"Finish {mode} of {len(results)} files with "
+        + ", ".join(f"{count} {status.value}" for status, count in counts.items())
+        + f", {format_filesize(size, unit='MB'):.1f} MB transferred")
 
+    return results
 
-def archive(output_filepath: Path, root_filepath: Path):
+
+def archive(output_filepath: Path, root_filepath: Path, *, workers: int = None, compresslevel: int = None, incremental: bool = False, verify: bool = False) -> ArchiveStats:
+    """
+    Zip the tree of `root_filepath`, see `archive_tree`.
+    @param incremental: reuse unchanged members of the archive already at `output_filepath` rather than compressing them again
+    @param verify: test the archive written before it replaces the existing one
+    """
 
     assert output_filepath.suffix.lower() == ".zip"
 
-    output_filepath = str(output_filepath).replace(output_filepath.suffix, "")
+    stats = archive_tree(output_filepath, root_filepath, workers=workers,
+                         compresslevel=compresslevel, incremental=incremental, verify=verify)
+
+    logger.success(f"Finish archiving {root_filepath} into {output_filepath} with {stats}, "
+                   f"{stats.bytes_saved / 1024 / 1024:.1f} MiB saved")
 
-    shutil.make_archive(output_filepath, "zip", root_filepath)
+    return stats
 
 
 def get_filesize(filepath: Path, formatter: Literal["kB", "MB", "GB"] | None = None) -> int:
@@ -265,48 +767,195 @@ def format_filesize(size_in_byte: Path, unit: Literal["kB", "MB", "GB"]) -> floa
             return size_in_byte / 1024 / 1024 / 1024
 
 
-def get_file_hash(filepath: Path) -> str:
+def get_file_hash(filepath: Path, algorithm: Algorithm = DEFAULT_ALGORITHM, *, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
     """
-    General-purpose solution that can process large files.
+    General-purpose solution that can process large files, see `hashing.Hasher.update_file`.
 
     Credit: https://stackoverflow.com/a/64994148
     Credit: https://stackoverflow.com/questions/22058048/hashing-a-file-in-python
     """
+    return hash_file(filepath, algorithm, chunk_size=chunk_size)
 
-    md5 = hashlib.md5()
 
-    with open(filepath, "rb") as f:
+def get_file_hashes(filepaths: Iterable[Path], algorithm: Algorithm = DEFAULT_ALGORITHM, *, workers: int = None, cache: FileStatCache = None) -> dict[Path, str]:
+    """
+    Hashes (see `get_file_hash`) of many files, read concurrently in threads: hashlib releases the GIL on large buffers.
+    @param cache: files unchanged since their hashes were cached are not read again, new hashes are cached as they come
+    """
 
-        while True:
-            # arbitrary number to reduce RAM usage
-            data = f.read(65536)
+    filepaths = list(filepaths)
+    namespace = algorithm
 
-            if not data:
-                break
+    hashes = dict[Path, str]()
+    pending = list[tuple[Path, os.stat_result]]()
+
+    for filepath in filepaths:
+        stat = os.stat(filepath)
+        hash = cache.get(filepath, namespace, stat) if cache is not None else None
+
+        if hash is None:
+            pending.append((filepath, stat))
+        else:
+            hashes[filepath] = hash
+
+    hits = len(hashes)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = zip(pending, executor.map(partial(get_file_hash, algorithm=algorithm), [filepath for filepath, _ in pending]))
+
+        # save progress along the way, a long run may be interrupted
+        while batch := list(islice(results, 256)):
+            if cache is not None:
+                cache.set_many([(filepath, hash, stat)
+                                for (filepath, stat), hash in batch], namespace)
+
+            hashes.update((filepath, hash) for (filepath, _), hash in batch)
 
-            md5.update(data)
+    logger.success(
+        f"Finish hashing {len(filepaths)} files with cache hits {hits} and misses {len(pending)}.")
 
-    return md5.hexdigest()
+    return {filepath: hashes[filepath] for filepath in filepaths}
+
+
+def find_duplicate_files(directories: Path | Iterable[Path], *,
+                         algorithm: Algorithm = DEFAULT_ALGORITHM,
+                         workers: int = None,
+                         cache: FileStatCache = None,
+                         action: Literal["hardlink", "delete"] | None = None) -> list[DuplicateGroup]:
+    """
+    Groups of files with the same contents in directory trees, see `duplicates.find_duplicates`:
+    files are compared by size, then by hashes of their ends, and only then hashed in full.
+    @param action: replace the duplicates of each group with hard links to its first file, or delete them
+    """
+
+    if isinstance(directories, Path):
+        directories = [directories]
+
+    entries = chain.from_iterable(walk_files(directory) for directory in directories)
+    groups, stats = find_duplicates(entries, algorithm=algorithm, workers=workers, cache=cache)
+
+    logger.success(
+        f"Finish finding duplicates of {stats.files} files with {len(groups)} groups, "
+        f"{format_filesize(sum(group.wasted for group in groups), unit='MB'):.1f} MB wasted, "
+        f"{stats.sampled} files sampled and {stats.hashed} hashed in full (cache hits {stats.cache_hits}).")
+
+    if action is not None:
+        results = deduplicate(groups, action)
+        failures = [result for result in results if result.error is not None]
+
+        for result in failures:
+            logger.warning(f"Fail to {action} {result.path}: {result.error}")
+
+        logger.success(f"Finish {action} of {len(results) - len(failures)} duplicates.")
+
+    return groups
 
 
 def get_exif_datetime(filepath: Path) -> YLDatetime:
     """
     Get datetime generated/taken of an image continuing EXIF.
+    JPEG and TIFF files are read by `exif.read_exif_datetime_string` without decoding the image, others with PIL.
     EXIF Tags code: https://exiv2.org/tags.html
     """
+    return parse_exif_datetime(read_exif_datetime(filepath))
+
+
+def get_exif_datetimes(filepaths: Iterable[Path], *, workers: int = None, cache: FileStatCache = None) -> dict[Path, YLDatetime | None]:
+    """
+    Datetimes (see `get_exif_datetime`) of many images, read concurrently in threads.
+    Images without a datetime, or that cannot be read, are mapped to None.
+    @param cache: EXIF datetimes of files unchanged since they were cached are not read again
+    """
+
+    filepaths = list(filepaths)
+    namespace = "exif_datetime"
+
+    # datetime strings as written in the files, "" for none
+    time_strs = dict[Path, str]()
+    pending = list[tuple[Path, os.stat_result]]()
+    hits = 0
+
+    for filepath in filepaths:
+        try:
+            stat = os.stat(filepath)
+        except OSError as error:
+            logger.warning(f"Failed to read EXIF of {filepath}: {error}")
+            time_strs[filepath] = ""
+            continue
+
+        time_str = cache.get(filepath, namespace, stat) if cache is not None else None
+
+        if time_str is None:
+            pending.append((filepath, stat))
+        else:
+            time_strs[filepath] = time_str
+            hits += 1
+
+    def read(filepath: Path) -> str | None:
+        try:
+            return read_exif_datetime(filepath) or ""
+        except Exception as error:
+            # not cached, the failure may not last; PIL raises more than OSError on damaged images
+            logger.warning(f"Failed to read EXIF of {filepath}: {error}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = zip(pending, executor.map(read, [filepath for filepath, _ in pending]))
+
+        # save progress along the way, a long run may be interrupted
+        while batch := list(islice(results, 256)):
+            if cache is not None:
+                cache.set_many([(filepath, time_str, stat)
+                                for (filepath, stat), time_str in batch
+                                if time_str is not None], namespace)
+
+            time_strs.update((filepath, time_str or "") for (filepath, _), time_str in batch)
+
+    logger.success(
+        f"Finish reading EXIF datetimes of {len(filepaths)} files with cache hits {hits} and misses {len(pending)}.")
+
+    result = dict[Path, YLDatetime | None]()
+
+    for filepath in filepaths:
+        try:
+            result[filepath] = parse_exif_datetime(time_strs[filepath] or None)
+        except ValueError:
+            logger.warning(
+                f"Invalid EXIF datetime {time_strs[filepath]} of {filepath}.")
+            result[filepath] = None
+
+    return result
+
+
+def read_exif_datetime(filepath: Path) -> str | None:
+    """
+    EXIF datetime of an image as written in the file, PIL reading the formats `exif` does not.
+    """
+
+    try:
+        return read_exif_datetime_string(filepath)
+    except ExifFormatError:
+        pass
 
-    EXIF_IMAGE_DATETIMEORIGINAL = 36867
-    EXIF_IMAGE_DATETIME = 306
+    # PIL is imported for the images `exif` cannot read only
+    from PIL import Image
 
-    im = Image.open(filepath)
-    exif = im.getexif()
-    im.close()
+    with Image.open(filepath) as im:
+        exif = im.getexif()
 
-    time_str = exif.get(EXIF_IMAGE_DATETIMEORIGINAL)
+    time_str = exif.get_ifd(EXIF_IFD_POINTER).get(EXIF_IMAGE_DATETIMEORIGINAL)
+
+    if time_str is None:
+        time_str = exif.get(EXIF_IMAGE_DATETIMEORIGINAL)
 
     if time_str is None:
         time_str = exif.get(EXIF_IMAGE_DATETIME)
 
+    return time_str
+
+
+def parse_exif_datetime(time_str: str | None) -> YLDatetime | None:
+
     if time_str is not None:
         time = YLDatetime.strptime(time_str, '%Y:%m:%d %H:%M:%S')
         return time.replace_timestandard(standard=TimeStandard.CST)
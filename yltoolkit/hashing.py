@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Hashing of contents and files.
+"""
+
+if __name__ == "__main__":
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+
+import hashlib
+import mmap
+import os
+from pathlib import Path
+from typing import Literal, Self
+
+# md5 is kept as the default for hashes already stored; which of the others is fastest depends on the CPU
+# (sha256 is hardware-accelerated on CPUs with SHA extensions, blake2b is fast without them), see `benchmarks`
+Algorithm = Literal["md5", "sha1", "sha256", "sha512", "blake2b", "blake2s"]
+ALGORITHMS: tuple[Algorithm, ...] = ("md5", "sha1", "sha256", "sha512", "blake2b", "blake2s")
+
+DEFAULT_ALGORITHM: Algorithm = "md5"
+DEFAULT_CHUNK_SIZE = 1 << 20
+# files at least this large are memory-mapped rather than read
+MMAP_THRESHOLD = 64 << 20
+
+
+class Hasher:
+    """
+    Streaming hash of contents fed one piece at a time.
+    """
+
+    def __init__(self, algorithm: Algorithm = DEFAULT_ALGORITHM) -> None:
+
+        if algorithm not in ALGORITHMS:
+            raise ValueError(
+                f"Unsupported hash algorithm {algorithm}, expected one of {', '.join(ALGORITHMS)}.")
+
+        self.algorithm = algorithm
+        self._hash = hashlib.new(algorithm)
+
+    def update(self, content: str | bytes | bytearray | memoryview) -> Self:
+        """
+        Feed content, strings being encoded in UTF-8.
+        """
+
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        self._hash.update(content)
+        return self
+
+    def update_file(self, filepath: Path, *, chunk_size: int = DEFAULT_CHUNK_SIZE, use_mmap: bool = None) -> Self:
+        """
+        Feed the contents of a file without copying them into new objects:
+        large files are memory-mapped, others read into one reused buffer.
+        @param use_mmap: map the file whatever its size (True), never (False), or from `MMAP_THRESHOLD` bytes (None)
+        """
+
+        with open(filepath, "rb", buffering=0) as file:
+            size = os.fstat(file.fileno()).st_size
+
+            if use_mmap is None:
+                use_mmap = size >= MMAP_THRESHOLD
+
+            if use_mmap and size > 0:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    with memoryview(mapped) as view:
+                        for start in range(0, size, chunk_size):
+                            self._hash.update(view[start: start + chunk_size])
+
+                return self
+
+            buffer = bytearray(chunk_size)
+
+            with memoryview(buffer) as view:
+                while count := file.readinto(buffer):
+                    self._hash.update(view[:count])
+
+        return self
+
+    def copy(self) -> "Hasher":
+
+        copied = Hasher.__new__(Hasher)
+        copied.algorithm = self.algorithm
+        copied._hash = self._hash.copy()
+
+        return copied
+
+    def digest(self) -> bytes:
+        return self._hash.digest()
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def hash_content(content: str | bytes, algorithm: Algorithm = DEFAULT_ALGORITHM) -> str:
+    return Hasher(algorithm).update(content).hexdigest()
+
+
+def hash_file(filepath: Path, algorithm: Algorithm = DEFAULT_ALGORITHM, *, chunk_size: int = DEFAULT_CHUNK_SIZE, use_mmap: bool = None) -> str:
+    return Hasher(algorithm).update_file(filepath, chunk_size=chunk_size, use_mmap=use_mmap).hexdigest()
@@ -7,11 +7,11 @@ Helper functions.
 """
 
 
-import hashlib
 from functools import wraps
 from typing import Callable, Collection, ParamSpec, TypeVar
 
 from yltoolkit.file_handlers import ensure_directory
+from yltoolkit.hashing import DEFAULT_ALGORITHM, Algorithm, hash_content
 
 P = ParamSpec('P')
 R = TypeVar("R")
@@ -82,5 +82,5 @@ def get_netstring(content: str) -> bytes:
     return bytes(f"{len(content)}:{content},", encoding="utf-8")
 
 
-def get_hash(content: str | bytes) -> str:
-    return hashlib.md5(content).hexdigest()
+def get_hash(content: str | bytes, algorithm: Algorithm = DEFAULT_ALGORITHM) -> str:
+    return hash_content(content, algorithm)
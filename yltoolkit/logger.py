@@ -13,7 +13,35 @@ if __name__ == "__main__":
     sys.path.insert(0, abspath(join(dirname(__file__), "../..")))
 
 
-from loguru import logger
+class LazyLogger:
+    """
+    `loguru.logger`, imported on first use: loguru costs a large part of the start-up of the toolkit,
+    which most runs of a command-line tool never log with.
+    Attributes are those of the loguru logger itself, so records keep the caller of `logger.info` and the like.
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str):
+        return getattr(_load_logger(), name)
+
+    def __repr__(self) -> str:
+        return repr(_load_logger()) if _logger is not None else "<lazy loguru logger>"
+
+
+_logger = None
+
+
+def _load_logger():
+    global _logger
+
+    if _logger is None:
+        from loguru import logger as _logger
+
+    return _logger
+
+
+logger = LazyLogger()
 
 """
 Credit: https://github.com/Delgan/loguru
@@ -13,20 +13,403 @@ if __name__ == "__main__":
     sys.path.insert(0, abspath(join(dirname(__file__), "../..")))
 
 
+import copy
+import inspect
+import types
 from abc import ABC
-from dataclasses import InitVar, asdict, dataclass, field, fields
+from dataclasses import MISSING, InitVar, dataclass, field, fields, is_dataclass
 from datetime import datetime, timedelta
+from itertools import product, repeat
+from operator import attrgetter
 from pathlib import Path
-from typing import TypeVar
+from typing import Any, Callable, ClassVar, Iterable, Iterator, Self, TypeVar, Union, get_args, get_origin, get_type_hints
 
 from yltoolkit.logger import logger
 from yltoolkit.YLDatetime import TimeStandard, YLDatetime
+from yltoolkit.YLDatetime.YLDatetime import DatetimeParser
 from yltoolkit.YLDatetime.tools import format_as_excel
 from yltoolkit.YLEnum import YLEnum
 
 ID = TypeVar("ID", str, int)
 
 
+class DecodingPlan:
+    """
+    How a `Codable` class decodes mappings with a given sequence of keys.
+    Built once per class and keys by `Codable.decoding_plan`.
+    """
+
+    # (key in mapping, attribute name, converter, whether the attribute is written into `__dict__`)
+    steps: list[tuple[str, str | None, Callable[[Any], Any] | None, bool]]
+    unknown_keys: list[str]
+
+    # (class, attribute name) already reported as unknown, see `Codable.reset_unknown_keys_report`
+    reported_unknown_keys: ClassVar[set[tuple[type, str]]] = set()
+
+    def __init__(self, codable_type: type["Codable"], keys: tuple[str, ...]) -> None:
+
+        self.codable_type = codable_type
+        self.steps = []
+        self.unknown_keys = []
+
+        converters = codable_type.field_converters if codable_type.TYPED_DECODING else {}
+        fieldnames = {field.name for field in fields(codable_type)}
+        plain_fields = codable_type._plain_fieldnames()
+
+        for key in keys:
+            name = key.lower().replace("-", "_")
+
+            if name in fieldnames or hasattr(codable_type, name):
+                self.steps.append((key, name, converters.get(name),
+                                   name in plain_fields))
+            else:
+                # keep a step for each key, so that steps line up with the mapping values
+                self.steps.append((key, None, None, False))
+                self.unknown_keys.append(key)
+
+        self.is_simple = all(name is not None and converter is None and plain
+                             for _, name, converter, plain in self.steps)
+        self.names = [name for _, name, _, _ in self.steps]
+        # decoded objects hold nothing but their fields, all in `__dict__`
+        self.holds_fields_only = codable_type._holds_fields_only() and all(name is None or name in fieldnames
+                                                                           for name in self.names)
+        # decoding only writes plain fields as they are, see `encoded` and `decode_columns`
+        writes_plain_values = all(name is None or (converter is None and plain)
+                                  for _, name, converter, plain in self.steps)
+        self.encodes_raw = codable_type._encodes_raw() and writes_plain_values
+        self.decodes_columns = self.holds_fields_only and writes_plain_values and \
+            all(default is not None or field.name in self.names
+                for field, default in zip(fields(codable_type), codable_type.encoding_plan().defaults))
+
+        if self.encodes_raw:
+            encoding_plan = codable_type.encoding_plan()
+            # the last key of a name wins, as in `apply`
+            positions = {name: position for position, name in enumerate(self.names)}
+            # (encoded key, position of the value in mappings or None, default)
+            self.raw_steps = [(key, positions.get(name), default)
+                              for key, name, default in zip(encoding_plan.keys, encoding_plan.names, encoding_plan.defaults)]
+
+    def encoded(self, mapping: dict[str, Any]) -> dict[str, Any]:
+        """
+        What `to_dict` gives for an object decoded from `mapping`, without decoding it; only for plans that `encodes_raw`.
+        Values are normalized like `apply` does, fields missing from `mapping` get their defaults.
+        """
+
+        values = tuple(mapping.values())
+        result = dict[str, Any]()
+        booleans = ENCODED_BOOLEAN_STRINGS
+
+        for key, position, default in self.raw_steps:
+
+            if position is None:
+                # defaults are not normalized
+                result[key] = encode_value(default())
+                continue
+
+            value = values[position]
+            value_type = value.__class__
+
+            if value_type is str:
+                result[key] = booleans.get(value, value) if value else None
+            elif value_type is bool:
+                result[key] = "TRUE" if value else "FALSE"
+            elif value_type in ATOMIC_TYPES:
+                result[key] = value
+            elif value_type is list:
+                result[key] = [copy_encoded_value(v) for v in value if v != ""]
+            else:
+                result[key] = encode_value(normalize_decoded_value(value))
+
+        if self.unknown_keys:
+            self.report_unknown_keys(mapping)
+
+        return result
+
+    def decode_columns(self, columns: list[list[Any]], count: int) -> Iterator["Codable"]:
+        """
+        `count` objects decoded from columns of normalized values (see `normalize_decoded_value`), one per key of this
+        plan in order; only for plans that `decodes_columns`. The objects are those `apply` gives, made without `__init__`.
+        """
+
+        codable_type = self.codable_type
+        by_name = {name: column for name, column in zip(self.names, columns)
+                   if name is not None}
+
+        names = list[str]()
+        field_columns = list[Iterable[Any]]()
+
+        for field in fields(codable_type):
+            names.append(field.name)
+
+            if field.name in by_name:
+                field_columns.append(by_name[field.name])
+            elif field.default is not MISSING:
+                field_columns.append(repeat(field.default, count))
+            else:
+                field_columns.append([field.default_factory() for _ in range(count)])
+
+        if self.unknown_keys and count:
+            self.report_unknown_keys({key: column[0] for (key, *_), column in zip(self.steps, columns)})
+
+        new = codable_type.__new__
+
+        for values in zip(*field_columns):
+            obj = new(codable_type)
+            obj.__dict__.update(zip(names, values))
+            yield obj
+
+    def apply(self, obj: "Codable", mapping: dict[str, Any]):
+        """
+        Decode `mapping` into `obj`, the keys of `mapping` being exactly (and in the order of) the keys of this plan.
+        """
+
+        if self.is_simple:
+            # plain fields without converters
+            attributes = obj.__dict__
+            booleans = BOOLEAN_STRINGS
+
+            for name, value in zip(self.names, mapping.values()):
+
+                if type(value) is str:
+                    if value in booleans:
+                        value = booleans[value]
+                    elif not value:
+                        value = None
+                elif type(value) is list:
+                    value = [v for v in value if v != ""]
+                elif type(value) not in ATOMIC_TYPES:
+                    value = normalize_decoded_value(value)
+
+                attributes[name] = value
+
+        else:
+            for (key, name, converter, plain), value in zip(self.steps, mapping.values()):
+
+                if name is None:
+                    continue
+
+                value = normalize_decoded_value(value)
+
+                if converter is not None and value is not None:
+                    try:
+                        value = converter(value)
+                    except Exception as e:
+                        raise ValueError(
+                            f"Cannot decode {key}: {value!r} for {self.codable_type}.") from e
+
+                if plain:
+                    obj.__dict__[name] = value
+                else:
+                    setattr(obj, name, value)
+
+        if self.unknown_keys:
+            self.report_unknown_keys(mapping)
+
+    def report_unknown_keys(self, mapping: dict[str, Any]):
+        """
+        Warn about the keys of `mapping` that are not attributes, once per class and key.
+        """
+
+        for key in self.unknown_keys:
+            name = key.lower().replace("-", "_")
+
+            if (self.codable_type, name) not in self.reported_unknown_keys:
+                self.reported_unknown_keys.add((self.codable_type, name))
+                logger.warning(
+                    f"{name}: {mapping[key]} not in implemented class.")
+
+
+# every upper / lower case spelling of "true" and "false"
+BOOLEAN_STRINGS: dict[str, bool] = {"".join(characters): word == "true"
+                                    for word in ("true", "false")
+                                    for characters in product(*((c, c.upper()) for c in word))}
+# the same strings, as `to_dict` encodes the booleans they decode into
+ENCODED_BOOLEAN_STRINGS: dict[str, str] = {string: str(value).upper()
+                                           for string, value in BOOLEAN_STRINGS.items()}
+
+
+def normalize_decoded_value(value: Any) -> Any:
+    """
+    Empty strings are None, `"true"` / `"false"` are booleans and empty strings are dropped from collections.
+    """
+
+    if isinstance(value, list | tuple | set):
+        value = [v for v in value if v != ""]
+    else:
+        value = value if value != "" else None
+
+    if isinstance(value, str) and value.lower() in ["true", "false"]:
+        if value.lower() == "true":
+            value = True
+        else:
+            value = False
+
+    return value
+
+
+def normalize_plain_value(value: Any) -> Any:
+    """
+    `normalize_decoded_value`, faster for strings and lists.
+    """
+
+    if value.__class__ is str:
+        return BOOLEAN_STRINGS.get(value, value) if value else None
+
+    if value.__class__ is list:
+        return [v for v in value if v != ""]
+
+    return normalize_decoded_value(value)
+
+
+class EncodingPlan:
+    """
+    How a `Codable` class encodes its fields into a dictionary.
+    Built once per class by `Codable.encoding_plan`.
+    """
+
+    def __init__(self, codable_type: type["Codable"]) -> None:
+
+        names = [field.name for field in fields(codable_type)]
+
+        self.names = names
+        self.keys = [name.lower().replace("_", "-") for name in names]
+        # callables giving the default value of each field, None for fields without default
+        self.defaults = [default_of(field) for field in fields(codable_type)]
+        self.getter = attrgetter(*names) if len(names) > 1 \
+            else (lambda obj: (getattr(obj, names[0]),) if names else ())
+
+    def encode(self, obj: "Codable") -> dict[str, Any]:
+
+        result = dict[str, Any]()
+        serializers = ENCODED_VALUE_SERIALIZERS
+
+        for key, value in zip(self.keys, self.getter(obj)):
+
+            try:
+                serializer = serializers[value.__class__]
+            except KeyError:
+                serializer = serializer_of(value.__class__)
+
+            result[key] = value if serializer is None else serializer(value)
+
+        return result
+
+
+def default_of(field) -> Callable[[], Any] | None:
+
+    if field.default is not MISSING:
+        return lambda: field.default
+
+    if field.default_factory is not MISSING:
+        return field.default_factory
+
+    return None
+
+
+def encode_aware_datetime(value: datetime) -> str:
+    if value.tzinfo is not None:
+        return format_as_excel(datetime=value, standard=TimeStandard.CST)
+    else:
+        return format_as_excel(datetime=value)
+
+
+def encode_yldatetime(value: YLDatetime) -> str:
+    if value.tzinfo is not None:
+        return value.as_excel(standard=TimeStandard.CST)
+    else:
+        return value.as_excel()
+
+
+# immutable values returned as they are by `copy.deepcopy`
+ATOMIC_TYPES = {str, int, float, bool, type(None)}
+
+
+def copy_encoded_value(value: Any) -> Any:
+    """
+    Copy a value the way `dataclasses.asdict` copies nested values.
+    """
+
+    if value.__class__ in ATOMIC_TYPES:
+        return value
+
+    elif value.__class__ is list:
+        return [copy_encoded_value(v) for v in value]
+
+    elif value.__class__ is dict:
+        return {copy_encoded_value(k): copy_encoded_value(v) for k, v in value.items()}
+
+    elif is_dataclass(value) and not isinstance(value, type):
+        return {field.name: copy_encoded_value(getattr(value, field.name))
+                for field in fields(value)}
+
+    elif isinstance(value, tuple) and hasattr(value, "_fields"):
+        return type(value)(*[copy_encoded_value(v) for v in value])
+
+    elif isinstance(value, list | tuple):
+        return type(value)(copy_encoded_value(v) for v in value)
+
+    elif isinstance(value, dict):
+        return type(value)((copy_encoded_value(k), copy_encoded_value(v))
+                           for k, v in value.items())
+
+    else:
+        return copy.deepcopy(value)
+
+
+# value type -> serializer in `Codable.to_dict`, None for values kept as they are
+ENCODED_VALUE_SERIALIZERS: dict[type, Callable[[Any], Any] | None] = {
+    str: None,
+    int: None,
+    float: None,
+    type(None): None,
+    bool: lambda value: str(value).upper(),
+}
+
+
+def encode_value(value: Any) -> Any:
+    """
+    A field value as `to_dict` encodes it.
+    """
+
+    try:
+        serializer = ENCODED_VALUE_SERIALIZERS[value.__class__]
+    except KeyError:
+        serializer = serializer_of(value.__class__)
+
+    return value if serializer is None else serializer(value)
+
+
+def serializer_of(value_type: type) -> Callable[[Any], Any] | None:
+
+    if issubclass(value_type, YLDatetime):
+        serializer = encode_yldatetime
+
+    elif issubclass(value_type, datetime):
+        serializer = encode_aware_datetime
+
+    elif issubclass(value_type, timedelta):
+        def serializer(value): return round(value.total_seconds())
+
+    elif issubclass(value_type, YLEnum):
+        def serializer(value): return value.as_encodable()
+
+    elif issubclass(value_type, bool):
+        def serializer(value): return str(value).upper()
+
+    elif issubclass(value_type, Path):
+        serializer = str
+
+    else:
+        serializer = copy_encoded_value
+
+    ENCODED_VALUE_SERIALIZERS[value_type] = serializer
+    return serializer
+
+
+_decoding_plans: dict[tuple[type, tuple[str, ...]], DecodingPlan] = {}
+_encoding_plans: dict[type, EncodingPlan] = {}
+
+
 @dataclass
 class Codable(ABC):
     """
@@ -37,29 +420,121 @@ class Codable(ABC):
 
     from_dict: InitVar[dict[str, str]] = None
 
+    # convert decoded values into the annotated field types (YLDatetime, datetime, YLEnum, bool, int, float, timedelta, Path)
+    TYPED_DECODING: ClassVar[bool] = False
+
     def __post_init__(self, from_dict: InitVar[dict[str, str]]):
 
         if from_dict is not None:
+            self.decoding_plan(tuple(from_dict)).apply(self, from_dict)
+
+    @classmethod
+    def decoding_plan(cls, keys: tuple[str, ...]) -> DecodingPlan:
 
-            for key, value in from_dict.items():
+        plan = _decoding_plans.get((cls, keys))
 
-                key = key.lower().replace("-", "_")
+        if plan is None:
+            plan = _decoding_plans[(cls, keys)] = DecodingPlan(cls, keys)
 
-                if isinstance(value, list | tuple | set):
-                    value = [v for v in value if v != ""]
-                else:
-                    value = value if value != "" else None
+        return plan
 
-                if isinstance(value, str) and value.lower() in ["true", "false"]:
-                    if value.lower() == "true":
-                        value = True
-                    else:
-                        value = False
+    @classmethod
+    def reset_unknown_keys_report(cls):
+        """
+        Report unknown keys of `cls` again, called before decoding each file.
+        """
+        DecodingPlan.reported_unknown_keys = {(codable_type, name)
+                                              for codable_type, name in DecodingPlan.reported_unknown_keys
+                                              if codable_type is not cls}
 
-                if hasattr(self, key):
-                    setattr(self, key, value)
-                else:
-                    logger.warning(f"{key}: {value} not in implemented class.")
+    @classmethod
+    def _plain_fieldnames(cls) -> set[str]:
+        """
+        Fields that could be written into the instance `__dict__` directly.
+        """
+
+        if cls.__setattr__ is not object.__setattr__:
+            return set()
+
+        return {field.name for field in fields(cls)
+                if not hasattr(type(inspect.getattr_static(cls, field.name, None)), "__set__")}
+
+    @classmethod
+    def _holds_fields_only(cls) -> bool:
+        """
+        Whether objects hold nothing but their fields, all of them in their `__dict__`:
+        no descriptor, `__setattr__` or `__post_init__` of their own.
+        """
+        return (cls._plain_fieldnames() == {field.name for field in fields(cls)}
+                and cls.__post_init__ is Codable.__post_init__)
+
+    @classmethod
+    def _encodes_raw(cls) -> bool:
+        """
+        Whether decoded mappings can be encoded without making objects (see `DecodingPlan.encoded`):
+        neither decoding nor encoding is customized and every field has a default.
+        """
+        return (cls.__post_init__ is Codable.__post_init__ and cls.to_dict is Codable.to_dict
+                and all(default is not None for default in cls.encoding_plan().defaults))
+
+    @classmethod
+    @property
+    def field_converters(cls) -> dict[str, Callable[[Any], Any]]:
+
+        try:
+            hints = get_type_hints(cls)
+        except NameError:
+            hints = {}
+
+        result = dict[str, Callable[[Any], Any]]()
+
+        for field in fields(cls):
+            converter = cls._converter_of(hints.get(field.name, field.type))
+
+            if converter is not None:
+                result[field.name] = converter
+
+        return result
+
+    @classmethod
+    def _converter_of(cls, annotation: Any) -> Callable[[Any], Any] | None:
+
+        # `X | None` and `Optional[X]`
+        if get_origin(annotation) in (Union, types.UnionType):
+            arguments = [a for a in get_args(annotation)
+                         if a is not type(None)]
+
+            if len(arguments) != 1:
+                return None
+
+            annotation = arguments[0]
+
+        if not isinstance(annotation, type):
+            return None
+
+        if issubclass(annotation, datetime):
+            if cls.ensure_datetime is not Codable.ensure_datetime:
+                return cls.ensure_datetime
+
+            # a parser of its own per field remembers the format of its values
+            return datetime_converter(DatetimeParser())
+
+        elif issubclass(annotation, YLEnum):
+            return annotation.ensure
+
+        elif issubclass(annotation, bool):
+            return decode_bool
+
+        elif issubclass(annotation, int | float):
+            return lambda value: value if isinstance(value, annotation) else annotation(value)
+
+        elif issubclass(annotation, timedelta):
+            return lambda value: value if isinstance(value, timedelta) else timedelta(seconds=float(value))
+
+        elif issubclass(annotation, Path):
+            return Path
+
+        return None
 
     @classmethod
     @property
@@ -68,39 +543,68 @@ class Codable(ABC):
                 for field in fields(cls)]
 
     def to_dict(self) -> dict[str, str]:
-        result = {key.lower().replace("_", "-"): value
-                  for key, value in asdict(self).items()}
+        return self.encoding_plan().encode(self)
 
-        # standardizer
-        for key, value in result.items():
+    @classmethod
+    def to_dicts(cls, items: Iterable[Self]) -> list[dict[str, str]]:
+        """
+        Encode `items` with one encoding plan per item type, honouring `to_dict` overrides.
+        """
 
-            if isinstance(value, YLDatetime):
-                if value.tzinfo is not None:
-                    result[key] = value.as_excel(standard=TimeStandard.CST)
-                else:
-                    result[key] = value.as_excel()
+        result = list[dict[str, str]]()
+        last_type, encode = None, None
 
-            elif isinstance(value, datetime):
-                if value.tzinfo is not None:
-                    result[key] = format_as_excel(
-                        datetime=value, standard=TimeStandard.CST)
-                else:
-                    result[key] = format_as_excel(datetime=value)
+        for item in items:
 
-            elif isinstance(value, timedelta):
-                result[key] = round(value.total_seconds())
+            if item.__class__ is not last_type:
+                last_type = item.__class__
+                encode = last_type.encoding_plan().encode \
+                    if last_type.to_dict is Codable.to_dict else last_type.to_dict
 
-            elif isinstance(value, YLEnum):
-                result[key] = value.as_encodable()
+            result.append(encode(item))
 
-            elif isinstance(value, bool):
-                result[key] = str(value).upper()
+        return result
 
-            elif isinstance(value, Path):
-                result[key] = str(value)
+    @classmethod
+    def encoding_plan(cls) -> EncodingPlan:
 
-        return result
+        plan = _encoding_plans.get(cls)
+
+        if plan is None:
+            plan = _encoding_plans[cls] = EncodingPlan(cls)
+
+        return plan
 
     @staticmethod
     def ensure_datetime(obj: str | YLDatetime) -> YLDatetime:
         return YLDatetime.ensure(obj).replace_timestandard(standard=TimeStandard.CST)
+
+
+def datetime_converter(parser: DatetimeParser) -> Callable[[Any], YLDatetime]:
+    """
+    `Codable.ensure_datetime` parsing with `parser`.
+    """
+
+    def convert(obj: str | YLDatetime) -> YLDatetime:
+        if not isinstance(obj, YLDatetime):
+            obj = parser.parse(obj)
+        return obj.replace_timestandard(standard=TimeStandard.CST)
+
+    return convert
+
+
+def decode_bool(value: Any) -> bool:
+
+    if isinstance(value, bool):
+        return value
+
+    if isinstance(value, str):
+        match value.lower():
+            case "1" | "yes" | "y" | "t":
+                return True
+            case "0" | "no" | "n" | "f":
+                return False
+            case _:
+                raise ValueError(f"{value} is not a boolean.")
+
+    return bool(value)
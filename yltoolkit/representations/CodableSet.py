@@ -14,19 +14,26 @@ if __name__ == "__main__":
 
 
 import json
+import os
 import re
 from abc import ABC
+from dataclasses import fields
 from collections import Counter
+from functools import partial
+from itertools import islice
+from operator import attrgetter
 from pathlib import Path
-from typing import Generic, Self, Type, TypeVar
+from typing import Any, Callable, Generic, Iterable, Iterator, Self, Type, TypeVar
 
-import flatten_dict
-
-from yltoolkit.file_handlers import read_csv, write_csv
+from yltoolkit.file_handlers import (RowTest, compile_row_filter, get_compression, iter_csv_rows, iter_json_list, open_file,
+                                    split_csv, strip_compression, write_csv)
 from yltoolkit.helpers import only_one_passed
 from yltoolkit.logger import logger
 
-from .Codable import ID, Codable
+from .Codable import ID, Codable, DecodingPlan, normalize_decoded_value, normalize_plain_value
+from .ColumnarSnapshot import ColumnarSnapshot
+from .FlattenedLayout import FlattenedLayout
+from .LazyObjectDict import LazyObjectDict, LazySource
 
 C = TypeVar("C", bound=Codable)
 
@@ -36,26 +43,72 @@ class CodableSet(ABC, Generic[C]):
     Codable object set.
     """
 
-    SUPPORTED_EXTENSION = ["csv", "json"]
+    SUPPORTED_EXTENSION = ["csv", "json", "ylcol"]
+
+    # attribute names of `_object_type` to be indexed, declared by subclasses, each name in one of them
+    UNIQUE_INDEXES: list[str] = []
+    INDEXES: list[str] = []
 
     datasource: Path
 
     _object_type: Type[C]
-    _object_dict: dict[ID, C]
+    _object_dict: dict[str, C] | LazyObjectDict[C]
     _id_sn: int
 
+    # index name -> indexed value -> normalized id (unique) or {normalized id: item}
+    _unique_indexes: dict[str, dict[Any, str]]
+    _indexes: dict[str, dict[Any, dict[str, C]]]
+    # normalized id -> index name -> value at the time the item was indexed
+    _indexed_values: dict[str, dict[str, Any]]
+    # raw entries were added by a lazy decode, indexes are rebuilt on the next lookup
+    _indexes_stale: bool
+
+    # normalized ids changed since the last decode / encode of `datasource`
+    _inserted: set[str]
+    _modified: set[str]
+    _removed: set[str]
+
     def __init__(self, object_type: Type[C] = None) -> None:
         super().__init__()
 
         if object_type is not None:
             self._object_type = object_type
 
-        self._object_dict = dict[ID, C]()
+        self._object_dict = dict[str, C]()
+
+        # `_indexed_values` keeps a single value by index name
+        if overlap := set(self.UNIQUE_INDEXES) & set(self.INDEXES):
+            raise ValueError(
+                f"{', '.join(sorted(overlap))} of {self.__class__} cannot be in both UNIQUE_INDEXES and INDEXES.")
+
+        self._unique_indexes = {name: dict[Any, str]()
+                                for name in self.UNIQUE_INDEXES}
+        self._indexes = {name: dict[Any, dict[str, C]]()
+                         for name in self.INDEXES}
+        self._indexed_values = dict[str, dict[str, Any]]()
+        self._indexes_stale = False
+
+        self._inserted = set[str]()
+        self._modified = set[str]()
+        self._removed = set[str]()
 
     @property
-    def all(self) -> dict[ID, C]:
+    def all(self) -> dict[str, C] | LazyObjectDict[C]:
         return self._object_dict
 
+    @property
+    def changes(self) -> dict[str, set[str]]:
+        """
+        Normalized ids inserted, modified and removed since the last decode / encode of `datasource`.
+        """
+        return {"inserted": set(self._inserted),
+                "modified": set(self._modified),
+                "removed": set(self._removed)}
+
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self._inserted or self._modified or self._removed)
+
     @property
     def next_id(self) -> str:
         if self._id_sn == -1:
@@ -67,28 +120,205 @@ class CodableSet(ABC, Generic[C]):
             return f"{self._id_sn}"
 
     def update(self, item: C):
-        self._object_dict[item.id] = item
+        key = self.normalize_id(item.id)
+        existed = key in self._object_dict
+
+        self._insert(item)
+
+        if existed:
+            self.mark_modified(key)
+        elif key in self._removed:
+            self._removed.discard(key)
+            self._modified.add(key)
+        else:
+            self._inserted.add(key)
+
+    def remove(self, id: ID) -> C:
+        """
+        Remove the item with `id` from the set and its indexes.
+        """
+
+        key = self.normalize_id(id)
+
+        if key not in self._object_dict:
+            raise LookupError("No item found with this criteria.")
+
+        self._unindex(key)
+
+        if key in self._inserted:
+            self._inserted.discard(key)
+        else:
+            self._modified.discard(key)
+            self._removed.add(key)
+
+        return self._object_dict.pop(key)
+
+    def mark_modified(self, id: ID):
+        """
+        Record an item changed in place, so that the next `checkpoint` writes it.
+        """
+
+        key = self.normalize_id(id)
+
+        if key not in self._inserted:
+            self._modified.add(key)
 
     @only_one_passed
     def get_item_by_id(self, id: ID) -> list[C]:
 
-        result = [item for item in self._object_dict.values()
-                  if item.id == id or item.id == f"{id}"]
-        return result
+        item = self._object_dict.get(self.normalize_id(id))
+        return [item] if item is not None else []
+
+    @only_one_passed
+    def get_item_by_index(self, name: str, value: Any) -> list[C]:
+        return self.get_items_by_index(name, value)
+
+    def get_items_by_index(self, name: str, value: Any) -> list[C]:
+        """
+        Items whose attribute `name` equals `value`, `name` being declared in `UNIQUE_INDEXES` or `INDEXES`.
+        """
+
+        if self._indexes_stale:
+            self._rebuild_indexes()
+
+        if name in self._unique_indexes:
+            key = self._unique_indexes[name].get(value)
+            return [self._object_dict[key]] if key is not None else []
+
+        elif name in self._indexes:
+            return list(self._indexes[name].get(value, {}).values())
+
+        else:
+            raise KeyError(f"{name} is not an index of {self.__class__}.")
+
+    @staticmethod
+    def normalize_id(id: ID) -> str:
+        """
+        Key of an item in `all`: `1` and `"1"` refer to the same item.
+        """
+        return f"{id}"
+
+    def _insert(self, item: C):
+        """
+        Insert or replace an item, keeping indexes in sync.
+        """
+
+        key = self.normalize_id(item.id)
+
+        if (self._unique_indexes or self._indexes) and not self._indexes_stale:
+            self._check_unique(key, item)
+            self._unindex(key)
+            self._index(key, item)
+
+        self._object_dict[key] = item
+
+    def _insert_raw(self, id: ID, payload: Any, source: LazySource):
+        """
+        Insert or replace an item not materialized yet, `id` being its raw decoded value.
+        """
+
+        if self._unique_indexes or self._indexes:
+            self._indexes_stale = True
+
+        key = self.normalize_id(normalize_decoded_value(id))
+        self._object_dict.add_raw(key, payload, source)
+
+    def _rebuild_indexes(self):
+        """
+        Index every item, materializing them.
+        """
+
+        self._indexed_values.clear()
+
+        for index in [*self._unique_indexes.values(), *self._indexes.values()]:
+            index.clear()
+
+        for key, item in self._object_dict.items():
+            self._check_unique(key, item)
+            self._index(key, item)
+
+        # left stale when an item breaks a unique index, to be rebuilt on the next lookup
+        self._indexes_stale = False
+
+    def _check_unique(self, key: str, item: C):
+
+        for name, index in self._unique_indexes.items():
+            value = getattr(item, name)
+            existing = index.get(value)
+
+            if existing is not None and existing != key:
+                raise ValueError(
+                    f"Duplicated value {value!r} of unique index {name} in {self.__class__}.")
+
+    def _index(self, key: str, item: C):
+
+        values = dict[str, Any]()
+
+        for name, index in self._unique_indexes.items():
+            value = getattr(item, name)
+            index[value] = key
+            values[name] = value
+
+        for name, index in self._indexes.items():
+            value = getattr(item, name)
+            index.setdefault(value, {})[key] = item
+            values[name] = value
 
-    def decode(self, filepath: Path, *args, **kwargs):
+        self._indexed_values[key] = values
+
+    def _unindex(self, key: str):
+
+        values = self._indexed_values.pop(key, {})
+
+        for name, value in values.items():
+
+            if name in self._unique_indexes:
+                self._unique_indexes[name].pop(value, None)
+
+            else:
+                bucket = self._indexes[name].get(value)
+
+                if bucket is not None:
+                    bucket.pop(key, None)
+
+                    if not bucket:
+                        del self._indexes[name][value]
+
+    def decode(self, filepath: Path, *args, lazy: bool = False, **kwargs):
+        """
+        @param lazy: keep rows raw and build each object the first time it is read from `all` or `get_item_by_id`.
+        Untouched rows are encoded as their objects would be, without making them when decoding them only
+        normalizes plain fields (see `DecodingPlan.encoded`). Ids must be stored in the file as they are.
+        """
 
         self.datasource = filepath
-        ext = filepath.suffix.lower().replace(".", "")
+        ext = self.extension_of(filepath)
 
         match ext:
             case "csv":
-                self.CSVCoding.decode(self, filepath, *args, **kwargs)
+                coding = self.CSVCoding
             case "json":
-                self.JSONCoding.decode(self, filepath, *args, **kwargs)
+                coding = self.JSONCoding
+            case "ylcol" if get_compression(filepath) is None:
+                coding = self.ColumnarCoding
             case _:
                 raise NotImplementedError
 
+        if lazy:
+            if not isinstance(self._object_dict, LazyObjectDict):
+                self._object_dict = LazyObjectDict(self._object_dict)
+
+            coding.decode_lazy(self, filepath, *args, **kwargs)
+        else:
+            coding.decode(self, filepath, *args, **kwargs)
+
+        journal_path = self.journal_path(filepath)
+
+        if journal_path.exists():
+            self._replay_journal(journal_path)
+
+        self._reset_changes()
+
         # set ID serialize number
         if len(self._object_dict) == 0:
             self._id_sn = 0
@@ -107,71 +337,344 @@ class CodableSet(ABC, Generic[C]):
         if filepath is None:
             filepath = self.datasource
 
-        ext = filepath.suffix.lower().replace(".", "")
+        ext = self.extension_of(filepath)
 
         match ext:
             case "csv":
                 self.CSVCoding.encode(self, filepath, *args, **kwargs)
             case "json":
                 self.JSONCoding.encode(self, filepath, *args, **kwargs)
+            case "ylcol" if get_compression(filepath) is None:
+                self.ColumnarCoding.encode(self, filepath, *args, **kwargs)
             case _:
                 raise NotImplementedError
 
+        # the main file now holds every change
+        if filepath == getattr(self, "datasource", None):
+            self.journal_path(filepath).unlink(missing_ok=True)
+            self._reset_changes()
+
         logger.success(
             f"Finish encoding {self.__class__} into {filepath} with items count {len(self._object_dict)}.")
 
+    @staticmethod
+    def extension_of(filepath: Path) -> str:
+        """
+        Extension naming the coding of a file, e.g. `csv` of `items.csv` and `items.csv.gz` (see `file_handlers.open_file`).
+        Columnar snapshots are memory-mapped: they cannot be compressed.
+        """
+        return strip_compression(filepath).suffix.lower().replace(".", "")
+
+    @staticmethod
+    def journal_path(filepath: Path) -> Path:
+        return filepath.with_name(f"{filepath.name}.journal")
+
+    def checkpoint(self) -> int:
+        """
+        Append changes since the last decode / encode / checkpoint to the journal next to `datasource`,
+        and sync it to disk. The journal is replayed by `decode` and folded into the main file by `compact`.
+        Return the number of journal records written.
+        """
+
+        journal_path = self.journal_path(self._require_datasource("checkpoint"))
+
+        records = [{"op": "upsert", "item": self._object_dict[key].to_dict()}
+                   for key in [*self._inserted, *self._modified]]
+        records += [{"op": "remove", "id": key}
+                    for key in self._removed]
+
+        if records:
+            self._drop_truncated_record(journal_path)
+
+            with open(journal_path, "a", encoding="utf-8", newline="") as file:
+                file.writelines(f"{json.dumps(record)}\n"
+                                for record in records)
+                file.flush()
+                os.fsync(file.fileno())
+
+        self._reset_changes()
+
+        logger.success(
+            f"Finish checkpointing {self.__class__} into {journal_path} with records count {len(records)}.")
+
+        return len(records)
+
+    def compact(self, *args, **kwargs):
+        """
+        Rewrite `datasource` with the current items and drop its journal.
+        """
+        self.encode(self._require_datasource("compact"), *args, **kwargs)
+
+    def _require_datasource(self, action: str) -> Path:
+
+        datasource = getattr(self, "datasource", None)
+
+        if datasource is None:
+            raise ValueError(
+                f"{self.__class__} has no datasource to {action}: decode it from a file first.")
+
+        return datasource
+
+    def _replay_journal(self, journal_path: Path):
+
+        with open(journal_path, "r", encoding="utf-8", newline="") as file:
+
+            for line in file:
+
+                if not line.endswith("\n"):
+                    # a checkpoint interrupted while appending, never completed
+                    logger.warning(
+                        f"Ignore the truncated last record of {journal_path}.")
+                    break
+
+                if not line.strip():
+                    continue
+
+                record = json.loads(line)
+
+                match record["op"]:
+                    case "upsert":
+                        self._insert(self._object_type(
+                            from_dict=record["item"]))
+                    case "remove":
+                        if record["id"] in self._object_dict:
+                            self._unindex(record["id"])
+                            del self._object_dict[record["id"]]
+                    case _:
+                        raise ValueError(
+                            f"Unknown journal operation {record['op']} in {journal_path}.")
+
+    @staticmethod
+    def _drop_truncated_record(journal_path: Path, chunk_size: int = 1 << 16):
+        """
+        Cut off a last record left without its line end by an interrupted checkpoint,
+        which records appended after it would otherwise be joined to.
+        """
+
+        try:
+            file = open(journal_path, "r+b")
+        except FileNotFoundError:
+            return
+
+        with file:
+            end = position = file.seek(0, os.SEEK_END)
+
+            while position > 0:
+                start = max(0, position - chunk_size)
+                file.seek(start)
+                chunk = file.read(position - start)
+
+                if position == end and chunk.endswith(b"\n"):
+                    return
+
+                line_end = chunk.rfind(b"\n")
+
+                if line_end >= 0:
+                    position = start + line_end + 1
+                    break
+
+                position = start
+
+            if position < end:
+                file.truncate(position)
+                logger.warning(
+                    f"Drop the truncated last record of {journal_path}.")
+
+    def _encoded_items(self) -> Iterable[dict[str, Any]]:
+        """
+        Encoded items in order, untouched rows of a lazy decode being dumped without materializing them.
+        """
+
+        if isinstance(self._object_dict, LazyObjectDict):
+            return self._object_dict.encoded_values()
+
+        return self._object_type.to_dicts(self._object_dict.values())
+
+    def _reset_changes(self):
+        self._inserted.clear()
+        self._modified.clear()
+        self._removed.clear()
+
     @classmethod
-    def init_from_serialized(cls, filepath: Path, object_type: Type[C] = None) -> Self:
+    def iter_decode(cls, filepath: Path, object_type: Type[C] = None, *args, batch_size: int = None, **kwargs) -> Iterator[C] | Iterator[list[C]]:
+        """
+        Decode objects from `filepath` one at a time, without holding the whole dataset.
+        @param object_type: defaults to `_object_type` of the set class
+        @param batch_size: yield lists of at most `batch_size` objects instead of single objects
+        """
+
+        if object_type is None:
+            object_type = cls._object_type
+
+        ext = cls.extension_of(filepath)
+
+        match ext:
+            case "csv":
+                objects = cls.CSVCoding.iter_decode(
+                    object_type, filepath, *args, **kwargs)
+            case "json":
+                objects = cls.JSONCoding.iter_decode(
+                    object_type, filepath, *args, **kwargs)
+            case "ylcol" if get_compression(filepath) is None:
+                objects = cls.ColumnarCoding.iter_decode(
+                    object_type, filepath, *args, **kwargs)
+            case _:
+                raise NotImplementedError
+
+        if batch_size is None:
+            yield from objects
+        else:
+            while batch := list(islice(objects, batch_size)):
+                yield batch
+
+    @classmethod
+    def init_from_serialized(cls, filepath: Path, object_type: Type[C] = None, **kwargs) -> Self:
 
         result = cls(object_type=object_type)
-        result.decode(filepath=filepath)
+        result.decode(filepath=filepath, **kwargs)
 
         return result
 
     class CSVCoding:
 
         @classmethod
-        def decode(cls, codable_set: "CodableSet[C]", filepath: Path, *args, **kwargs):
+        def decode(cls, codable_set: "CodableSet[C]", filepath: Path, *args, workers: int = None, **kwargs):
+            """
+            @param workers: parse byte ranges of the file in this many processes, `_object_type` must be picklable;
+            compressed files are decoded in this process
+            @param columns, where: see `iter_decode`
+            """
+
+            if workers is not None and workers > 1 and get_compression(filepath) is None:
+                for object in cls.iter_decode_in_processes(
+                        codable_set._object_type, filepath, *args, workers=workers, **kwargs):
+                    codable_set._insert(object)
+            else:
+                for object in cls.iter_decode(codable_set._object_type, filepath, *args, **kwargs):
+                    codable_set._insert(object)
+
+            return codable_set
+
+        @classmethod
+        def decode_lazy(cls, codable_set: "CodableSet[C]", filepath: Path, *args, use_flatten: bool = True, columns: Iterable[str] = None, where: dict[str, RowTest] = None, buffer_size: int = None, **kwargs):
 
-            use_flatten: bool = kwargs.get("use_flatten", True)
+            object_type = codable_set._object_type
+            object_type.reset_unknown_keys_report()
 
-            def mapping_handler(mapping: dict[str, str]) -> None:
-                if use_flatten:
-                    mapping = cls.unflatten(mapping)
+            rows = iter_csv_rows(filepath, buffer_size=buffer_size)
+            fieldnames = next(rows, [])
+            layout = cls.compile_layout(fieldnames, use_flatten, columns)
 
-                object: Codable = codable_set._object_type(
-                    from_dict=mapping)
-                codable_set._object_dict[object.id] = object
+            if where:
+                rows = filter(compile_row_filter(fieldnames, where), rows)
 
-            read_csv(filepath=filepath,
-                     mapping_handler=mapping_handler)
+            # raw rows are kept, smaller than their dictionaries
+            source = lazy_source(object_type, layout.unflatten)
+            id_index = layout.index_of(find_id_key(layout.shape))
+
+            for row in rows:
+                id = row[id_index] if id_index is not None and id_index < len(row) else None
+                codable_set._insert_raw(id, row, source)
 
             return codable_set
 
         @classmethod
-        def encode(cls, codable_set: "CodableSet[C]", filepath: Path, *args, use_flatten: bool = True, **kwargs):
+        def iter_decode_in_processes(cls, object_type: Type[C], filepath: Path, *args, workers: int, use_flatten: bool = True, columns: Iterable[str] = None, where: dict[str, RowTest] = None, **kwargs) -> Iterator[C]:
+            """
+            Decode records split by `split_csv` in a process pool, yielding objects in file order.
+            Processes send back the field values of objects holding nothing but fields in their `__dict__`,
+            which are rebuilt here without decoding them again, and the pickled objects otherwise;
+            unknown keys are reported here once.
+            Predicates of `where` are sent to the processes: they must be picklable, e.g. not lambdas.
+            """
+
+            object_type.reset_unknown_keys_report()
+
+            # a few ranges per worker to balance uneven ranges
+            fieldnames, ranges = split_csv(filepath, parts=workers * 4)
+
+            if len(ranges) <= 1:
+                yield from cls.iter_decode(object_type, filepath, *args, use_flatten=use_flatten,
+                                           columns=columns, where=where, **kwargs)
+                return
+
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+
+                decode_range = partial(_decode_csv_range, object_type, filepath, fieldnames,
+                                       use_flatten=use_flatten, columns=columns, where=where)
+
+                plan = object_type.decoding_plan(tuple(cls.compile_layout(fieldnames, use_flatten, columns).shape))
+                new = object_type.__new__
+
+                for unknown, names, rows in executor.map(decode_range, *zip(*ranges)):
+                    if unknown:
+                        plan.report_unknown_keys(unknown)
+
+                    if names is None:
+                        yield from rows
+                        continue
+
+                    for values in rows:
+                        object = new(object_type)
+                        object.__dict__.update(zip(names, values))
+                        yield object
+
+        @classmethod
+        def iter_decode(cls, object_type: Type[C], filepath: Path, *args, use_flatten: bool = True, columns: Iterable[str] = None, where: dict[str, RowTest] = None, buffer_size: int = None, **kwargs) -> Iterator[C]:
+            """
+            @param columns: keys of the objects to decode, `key` standing for its flattened columns `key::...` too;
+            the id is always decoded
+            @param where: column name -> predicate of the raw value, or value it must equal (see `compile_row_filter`)
+            Rows are filtered and projected before any dictionary or object is made.
+            """
+
+            object_type.reset_unknown_keys_report()
+
+            rows = iter_csv_rows(filepath, buffer_size=buffer_size)
+            fieldnames = next(rows, [])
+            layout = cls.compile_layout(fieldnames, use_flatten, columns)
+
+            if where:
+                rows = filter(compile_row_filter(fieldnames, where), rows)
+
+            for row in rows:
+                yield object_type(from_dict=layout.unflatten(row))
+
+        @staticmethod
+        def compile_layout(fieldnames: list[str], use_flatten: bool = True, columns: Iterable[str] = None) -> FlattenedLayout:
+
+            if columns is not None:
+                # objects are keyed by id
+                id_key = find_id_key(fieldnames)
+                columns = [*columns, id_key] if id_key is not None else columns
+
+            return FlattenedLayout(fieldnames, use_flatten=use_flatten, columns=columns)
+
+        @classmethod
+        def encode(cls, codable_set: "CodableSet[C]", filepath: Path, *args, use_flatten: bool = True, compresslevel: int = None, buffer_size: int = None, **kwargs):
 
             fieldnames = codable_set._object_type.fieldnames
+            items = list(codable_set._encoded_items())
 
             if use_flatten:
-                items = {k: cls.flatten(v.to_dict())
-                         for k, v in codable_set._object_dict.items()}
-                fieldnames = cls.update_fieldnames_if_flattened(
-                    fieldnames=fieldnames, flattened_items=items)
-
-            else:
-                items = codable_set._object_dict.items()
+                fieldnames, items = FlattenedLayout.flatten(items, fieldnames)
 
-            write_csv(items=items.values(),
+            write_csv(items=items,
                       filepath=filepath,
-                      fieldnames=fieldnames)
+                      fieldnames=fieldnames,
+                      compresslevel=compresslevel,
+                      buffer_size=buffer_size)
 
         @staticmethod
         def flatten(mapping: dict) -> dict:
+            import flatten_dict
             return flatten_dict.flatten(mapping, reducer="double-colon", enumerate_types=(list, set), keep_empty_types=(dict, set))
 
         @staticmethod
         def unflatten(mapping: dict) -> dict:
+            import flatten_dict
             return flatten_dict.unflatten(mapping, splitter="double-colon")
 
         @staticmethod
@@ -210,25 +713,187 @@ class CodableSet(ABC, Generic[C]):
 
     class JSONCoding:
 
+        @classmethod
+        def decode(cls, codable_set: "CodableSet[C]", filepath: Path, *args, **kwargs) -> "CodableSet[C]":
+
+            for object in cls.iter_decode(codable_set._object_type, filepath, *args, **kwargs):
+                codable_set._insert(object)
+
+            return codable_set
+
+        @staticmethod
+        def iter_decode(object_type: Type[C], filepath: Path, *args, encoding="utf-8", buffer_size: int = None, **kwargs) -> Iterator[C]:
+
+            object_type.reset_unknown_keys_report()
+
+            for item in iter_json_list(filepath, encoding=encoding, buffer_size=buffer_size):
+                yield object_type(from_dict=item)
+
         @staticmethod
-        def decode(codable_set: "CodableSet[C]", filepath: Path, *args, encoding="utf-8", newline="", **kwargs) -> "CodableSet[C]":
+        def decode_lazy(codable_set: "CodableSet[C]", filepath: Path, *args, encoding="utf-8", buffer_size: int = None, **kwargs) -> "CodableSet[C]":
 
-            with open(filepath, "r", encoding=encoding, newline=newline) as file:
+            object_type = codable_set._object_type
+            object_type.reset_unknown_keys_report()
 
-                items: list = json.load(file)
+            source = lazy_source(object_type, lambda item: item)
 
-                for item in items:
-                    object: Codable = codable_set._object_type(from_dict=item)
-                    codable_set._object_dict[item["id"]] = object
+            for item in iter_json_list(filepath, encoding=encoding, buffer_size=buffer_size):
+                codable_set._insert_raw(
+                    item.get(find_id_key(item)), item, source)
 
             return codable_set
 
         @staticmethod
-        def encode(codable_set: "CodableSet[C]", filepath: Path, *args, encoding="utf-8", newline="", **kwargs):
+        def encode(codable_set: "CodableSet[C]", filepath: Path, *args, encoding="utf-8", newline="", compresslevel: int = None, buffer_size: int = None, **kwargs):
 
-            with open(filepath, "w", encoding=encoding, newline=newline) as file:
+            with open_file(filepath, "w", encoding=encoding, newline=newline,
+                           compresslevel=compresslevel, buffer_size=buffer_size) as file:
 
-                items: list = [object.to_dict()
-                               for object in codable_set._object_dict.values()]
+                items: list = list(codable_set._encoded_items())
 
                 json.dump(items, file, indent=4)
+
+    class ColumnarCoding:
+        """
+        Binary columnar snapshot, see `ColumnarSnapshot`.
+        """
+
+        @classmethod
+        def decode(cls, codable_set: "CodableSet[C]", filepath: Path, *args, **kwargs) -> "CodableSet[C]":
+
+            for object in cls.iter_decode(codable_set._object_type, filepath, *args, **kwargs):
+                codable_set._insert(object)
+
+            return codable_set
+
+        @staticmethod
+        def iter_decode(object_type: Type[C], filepath: Path, *args, **kwargs) -> Iterator[C]:
+            """
+            Objects of classes holding their fields only are made from batches of columns (see `DecodingPlan.decode_columns`),
+            others from the mapping of each row.
+            """
+
+            object_type.reset_unknown_keys_report()
+
+            with ColumnarSnapshot(filepath) as snapshot:
+                plan = object_type.decoding_plan(tuple(snapshot.fieldnames))
+
+                if not plan.decodes_columns:
+                    for row in snapshot:
+                        yield object_type(from_dict=row)
+                    return
+
+                # values are normalized a batch of each column at a time, once per distinct value of dictionary columns
+                for count, columns in snapshot.iter_columns(normalize=normalize_plain_value):
+                    yield from plan.decode_columns(columns, count)
+
+        @staticmethod
+        def decode_lazy(codable_set: "CodableSet[C]", filepath: Path, *args, **kwargs) -> "CodableSet[C]":
+            """
+            Only the id column is read, rows are decoded from the memory-mapped snapshot when accessed.
+            The snapshot is closed once none of its rows is left raw: all materialized, replaced (e.g. by decoding the set
+            again) or removed.
+            """
+
+            object_type = codable_set._object_type
+            object_type.reset_unknown_keys_report()
+
+            snapshot = ColumnarSnapshot(filepath)
+            id_key = find_id_key(snapshot.fieldnames)
+            ids = snapshot.column(id_key).to_list() if id_key is not None \
+                else [None] * snapshot.rows
+
+            # rows are dumped in order, a batch of each column at a time
+            source = lazy_source(object_type, snapshot.row, snapshot.row_in_batch, close=snapshot.close)
+
+            for index, id in enumerate(ids):
+                codable_set._insert_raw(id, index, source)
+
+            if not ids:
+                snapshot.close()
+
+            return codable_set
+
+        @staticmethod
+        def encode(codable_set: "CodableSet[C]", filepath: Path, *args, **kwargs):
+
+            object_type = codable_set._object_type
+
+            ColumnarSnapshot.write(filepath,
+                                   items=codable_set._encoded_items(),
+                                   fieldnames=object_type.fieldnames,
+                                   type_name=f"{object_type.__module__}.{object_type.__qualname__}")
+
+
+def lazy_source(object_type: Type[C], mapping_of: Callable[[Any], dict[str, Any]], mapping_in_order: Callable[[Any], dict[str, Any]] = None, close: Callable[[], None] = None) -> LazySource:
+    """
+    Raw entries turned into decoded mappings by `mapping_of`, loaded into `object_type`
+    and dumped without making objects when the decoding plan `encodes_raw`.
+    @param mapping_in_order: like `mapping_of`, faster for entries dumped in order
+    @param close: see `LazySource`
+    """
+
+    mapping_in_order = mapping_in_order or mapping_of
+
+    def load(payload: Any) -> C:
+        return object_type(from_dict=mapping_of(payload))
+
+    def dump(payload: Any) -> dict[str, Any]:
+        mapping = mapping_in_order(payload)
+        plan = object_type.decoding_plan(tuple(mapping))
+
+        if plan.encodes_raw:
+            return plan.encoded(mapping)
+
+        return object_type(from_dict=mapping).to_dict()
+
+    return LazySource(load, dump, close)
+
+
+def find_id_key(keys: Iterable[str]) -> str | None:
+    """
+    The key decoded into `Codable.id`.
+    """
+    return next((key for key in keys
+                 if key is not None and key.lower().replace("-", "_") == "id"), None)
+
+
+def _decode_csv_range(object_type: Type[C], filepath: Path, fieldnames: list[str], start: int, end: int, use_flatten: bool = True, columns: list[str] = None, where: dict[str, RowTest] = None) -> tuple[dict[str, Any], tuple[str, ...] | None, list[tuple] | list[C]]:
+    """
+    Decode the records of a byte range in a worker process, and return what the parent process needs to rebuild them:
+    the values of unknown keys in the first record, to be reported by the parent,
+    and the objects as field names and the field values of each object, smaller to send back than the pickled objects,
+    or as no names and the objects themselves when they may hold more than their fields (see `DecodingPlan.holds_fields_only`).
+    """
+
+    layout = CodableSet.CSVCoding.compile_layout(fieldnames, use_flatten, columns)
+    plan = object_type.decoding_plan(tuple(layout.shape))
+    rows = iter_csv_rows(filepath, start, end)
+
+    if where:
+        rows = filter(compile_row_filter(fieldnames, where), rows)
+
+    # reported by the parent, not once by each process
+    DecodingPlan.reported_unknown_keys.update((object_type, key.lower().replace("-", "_"))
+                                              for key in plan.unknown_keys)
+
+    if plan.holds_fields_only:
+        names = tuple(field.name for field in fields(object_type))
+        getter = attrgetter(*names) if len(names) > 1 else (lambda obj: (getattr(obj, names[0]),))
+    else:
+        names, getter = None, None
+
+    unknown = None
+    results = list[tuple | C]()
+
+    for row in rows:
+        mapping = layout.unflatten(row)
+
+        if unknown is None:
+            unknown = {key: mapping[key] for key in plan.unknown_keys}
+
+        object = object_type(from_dict=mapping)
+        results.append(getter(object) if getter is not None else object)
+
+    return unknown or {}, names, results
+
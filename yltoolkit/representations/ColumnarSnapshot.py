@@ -0,0 +1,434 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Binary columnar snapshot of encoded objects.
+"""
+
+if __name__ == "__main__":
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "../..")))
+
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate, pairwise
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Self, Sequence
+
+"""
+File layout:
+
+    magic           8 bytes, `MAGIC`
+    header length   little-endian uint64
+    header          UTF-8 JSON, see `ColumnarSnapshot.write`
+    padding         up to a multiple of 8 bytes
+    sections        column data, each section aligned to 8 bytes
+
+Column kinds:
+
+    null    every value is None
+    int     int64 values
+    float   float64 values
+    str     uint64 offsets (rows + 1) into a UTF-8 blob
+    dict    uint16 codes into a dictionary of strings kept in the header
+    json    like `str`, each value being JSON text
+
+Arrays are in the byte order named by the header. Columns other than `null` have an optional validity bitmap,
+bit `i` being set when row `i` is not None.
+"""
+
+MAGIC = b"YLCOL\x00\x01\x00"
+ALIGNMENT = 8
+
+# dictionary-encode string columns with at most this many distinct values ...
+DICTIONARY_MAX_SIZE = 1 << 16
+# ... and at most one distinct value for this many rows
+DICTIONARY_MIN_REPEAT = 2
+
+
+class ColumnView(Sequence):
+    """
+    Values of a column, decoded one at a time when accessed.
+    """
+
+    def __init__(self, snapshot: "ColumnarSnapshot", meta: dict[str, Any]) -> None:
+
+        self.name: str = meta["name"]
+        self.kind: str = meta["kind"]
+        self._length = snapshot.rows
+
+        self._validity = snapshot._section(meta["validity"]) \
+            if meta.get("validity") is not None else None
+
+        match self.kind:
+            case "null":
+                pass
+            case "int":
+                self._values = snapshot._array(meta["values"], "q")
+            case "float":
+                self._values = snapshot._array(meta["values"], "d")
+            case "str" | "json":
+                self._offsets = snapshot._array(meta["offsets"], "Q")
+                self._data = snapshot._section(meta["data"])
+            case "dict":
+                self._codes = snapshot._array(meta["codes"], meta["code_type"])
+                self._dictionary: list[str] = meta["dictionary"]
+            case _:
+                raise ValueError(f"Unknown column kind {self.kind}.")
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> Any:
+
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+
+        if index < 0:
+            index += self._length
+
+        if not 0 <= index < self._length:
+            raise IndexError("Column index out of range.")
+
+        if self.kind == "null":
+            return None
+
+        if self._validity is not None and not (self._validity[index >> 3] >> (index & 7)) & 1:
+            return None
+
+        match self.kind:
+            case "int" | "float":
+                return self._values[index]
+            case "dict":
+                return self._dictionary[self._codes[index]]
+            case "str":
+                return str(self._data[self._offsets[index]: self._offsets[index + 1]], "utf-8")
+            case "json":
+                return json.loads(str(self._data[self._offsets[index]: self._offsets[index + 1]], "utf-8"))
+
+    def to_list(self, start: int = 0, stop: int = None, normalize: Callable[[Any], Any] = None) -> list[Any]:
+        """
+        Decode rows `start` to `stop` of the column at once.
+        @param normalize: applied to the values other than numbers and None, once per distinct value of `dict` columns
+        """
+
+        start, stop, _ = slice(start, stop).indices(self._length)
+
+        match self.kind:
+            case "null":
+                return [None] * (stop - start)
+            case "int" | "float":
+                values = self._values[start: stop].tolist()
+            case "dict":
+                dictionary = self._dictionary if normalize is None else \
+                    [normalize(value) for value in self._dictionary]
+                values = [dictionary[code]
+                          for code in self._codes[start: stop].tolist()]
+            case "str" | "json":
+                offsets = self._offsets[start: stop + 1].tolist()
+                data = bytes(self._data[offsets[0]: offsets[-1]]) if offsets else b""
+                base = offsets[0] if offsets else 0
+
+                values = [str(data[begin - base: end - base], "utf-8")
+                          for begin, end in pairwise(offsets)]
+
+                if self.kind == "json":
+                    # one document for the batch
+                    parsed = iter(json.loads(f"[{','.join(value for value in values if value)}]"))
+                    values = [next(parsed) if value else None
+                              for value in values]
+
+                if normalize is not None:
+                    values = [normalize(value) for value in values]
+
+        if self._validity is not None:
+            validity = self._validity
+            values = [value if (validity[i >> 3] >> (i & 7)) & 1 else None
+                      for i, value in enumerate(values, start)]
+
+        return values
+
+    def release(self):
+        for name in ("_values", "_offsets", "_data", "_codes", "_validity"):
+            view = getattr(self, name, None)
+
+            if isinstance(view, memoryview):
+                view.release()
+
+
+class ColumnarSnapshot:
+    """
+    Memory-mapped reader of a columnar snapshot file.
+    Nothing but the header is decoded on opening: columns and rows are decoded when accessed.
+    """
+
+    def __init__(self, filepath: Path) -> None:
+
+        self.filepath = filepath
+
+        self._file = open(filepath, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = list[memoryview]()
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{filepath} is not a columnar snapshot.")
+
+        (header_length,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        self.header: dict[str, Any] = json.loads(
+            self._mmap[header_start: header_start + header_length])
+
+        self._data_start = _aligned(header_start + header_length)
+        self._native = self.header["byteorder"] == sys.byteorder
+        self._columns = dict[str, ColumnView]()
+
+        # rows last decoded by `row_in_batch`: (first row index, column names, values of each row)
+        self._batch: tuple[int, list[str], list[tuple]] = (-1, [], [])
+
+    @property
+    def rows(self) -> int:
+        return self.header["rows"]
+
+    @property
+    def fieldnames(self) -> list[str]:
+        return [column["name"] for column in self.header["columns"]]
+
+    def column(self, name: str) -> ColumnView:
+
+        if name not in self._columns:
+            meta = next((column for column in self.header["columns"]
+                         if column["name"] == name), None)
+
+            if meta is None:
+                raise KeyError(f"{name} is not a column of {self.filepath}.")
+
+            self._columns[name] = ColumnView(self, meta)
+
+        return self._columns[name]
+
+    def row(self, index: int) -> dict[str, Any]:
+        return {name: self.column(name)[index]
+                for name in self.fieldnames}
+
+    def row_in_batch(self, index: int, batch_size: int = 1 << 12) -> dict[str, Any]:
+        """
+        Row `index`, decoding the batch of `batch_size` rows it is in at once and keeping it until the next batch:
+        faster than `row` for rows read in order, slower for rows read at random.
+        """
+
+        start = index - index % batch_size
+
+        if self._batch[0] != start:
+            names = self.fieldnames
+            columns = [self.column(name).to_list(start, start + batch_size)
+                       for name in names]
+            self._batch = (start, names, list(zip(*columns)))
+
+        _, names, rows = self._batch
+        return dict(zip(names, rows[index - start]))
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self.iter_rows()
+
+    def iter_columns(self, batch_size: int = 1 << 16, normalize: Callable[[Any], Any] = None) -> Iterator[tuple[int, list[list[Any]]]]:
+        """
+        Batches of at most `batch_size` rows in order, as their count and the values of each column.
+        @param normalize: see `ColumnView.to_list`
+        """
+
+        columns = [self.column(name) for name in self.fieldnames]
+
+        for start in range(0, self.rows, batch_size):
+            yield (min(batch_size, self.rows - start),
+                   [column.to_list(start, start + batch_size, normalize)
+                    for column in columns])
+
+    def iter_rows(self, batch_size: int = 1 << 16) -> Iterator[dict[str, Any]]:
+        """
+        Rows in order, decoding `batch_size` rows of every column at a time.
+        """
+
+        names = self.fieldnames
+        columns = [self.column(name) for name in names]
+
+        for start in range(0, self.rows, batch_size):
+            batch = [column.to_list(start, start + batch_size)
+                     for column in columns]
+
+            for values in zip(*batch):
+                yield dict(zip(names, values))
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+
+        for column in self._columns.values():
+            column.release()
+
+        for view in self._views:
+            view.release()
+
+        self._columns.clear()
+        self._views.clear()
+        self._batch = (-1, [], [])
+
+        self._mmap.close()
+        self._file.close()
+
+    def _section(self, location: list[int]) -> memoryview:
+
+        offset, length = location
+        start = self._data_start + offset
+
+        view = memoryview(self._mmap)[start: start + length]
+        self._views.append(view)
+
+        return view
+
+    def _array(self, location: list[int], typecode: str) -> memoryview | array:
+
+        if self._native:
+            return self._section(location).cast(typecode)
+
+        values = array(typecode, self._section(location))
+        values.byteswap()
+
+        return values
+
+    @classmethod
+    def write(cls, filepath: Path, items: Iterable[dict[str, Any]], *, fieldnames: list[str] = None, type_name: str = None):
+        """
+        Write encoded items (e.g. from `Codable.to_dict`) into a snapshot.
+        @param fieldnames: columns in order, keys of the items not listed are appended
+        """
+
+        items = list(items)
+        fieldnames = list(dict.fromkeys(
+            [*(fieldnames or []), *(key for item in items for key in item)]))
+
+        sections = list[bytes]()
+        size = 0
+
+        def add(data: bytes) -> list[int]:
+            nonlocal size
+
+            location = [size, len(data)]
+            padding = _aligned(len(data)) - len(data)
+
+            sections.append(data)
+            sections.append(b"\x00" * padding)
+            size += len(data) + padding
+
+            return location
+
+        columns = list[dict[str, Any]]()
+
+        for name in fieldnames:
+            values = [item.get(name) for item in items]
+            columns.append(_encode_column(name, values, add))
+
+        header = json.dumps({
+            "version": 1,
+            "byteorder": sys.byteorder,
+            "rows": len(items),
+            "type": type_name,
+            "columns": columns,
+        }).encode("utf-8")
+
+        header_end = len(MAGIC) + 8 + len(header)
+
+        # replace rather than overwrite, a snapshot of the same file may still be mapped
+        temporary_filepath = filepath.with_name(f"{filepath.name}.tmp")
+
+        with open(temporary_filepath, "wb") as file:
+            file.write(MAGIC)
+            file.write(struct.pack("<Q", len(header)))
+            file.write(header)
+            file.write(b"\x00" * (_aligned(header_end) - header_end))
+            file.writelines(sections)
+
+        os.replace(temporary_filepath, filepath)
+
+
+def _aligned(size: int) -> int:
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _encode_column(name: str, values: list[Any], add) -> dict[str, Any]:
+
+    present = [value for value in values if value is not None]
+    meta = {"name": name}
+
+    if len(present) < len(values):
+        bitmap = bytearray((len(values) + 7) // 8)
+
+        for index, value in enumerate(values):
+            if value is not None:
+                bitmap[index >> 3] |= 1 << (index & 7)
+
+        meta["validity"] = add(bytes(bitmap))
+
+    types = {type(value) for value in present}
+
+    if not present:
+        meta["kind"] = "null"
+        meta.pop("validity", None)
+
+    elif types == {int} and all(-(1 << 63) <= value < (1 << 63) for value in present):
+        meta["kind"] = "int"
+        meta["values"] = add(array("q", (value if value is not None else 0
+                                         for value in values)).tobytes())
+
+    elif types == {float}:
+        meta["kind"] = "float"
+        meta["values"] = add(array("d", (value if value is not None else 0.0
+                                         for value in values)).tobytes())
+
+    elif types == {str}:
+        dictionary = dict.fromkeys(present)
+
+        if len(dictionary) <= DICTIONARY_MAX_SIZE and len(dictionary) * DICTIONARY_MIN_REPEAT <= len(present):
+            codes = {value: code for code, value in enumerate(dictionary)}
+
+            meta["kind"] = "dict"
+            meta["code_type"] = "H"
+            meta["dictionary"] = list(dictionary)
+            meta["codes"] = add(array("H", (codes[value] if value is not None else 0
+                                            for value in values)).tobytes())
+
+        else:
+            meta["kind"] = "str"
+            meta.update(_encode_strings(values, add))
+
+    else:
+        meta["kind"] = "json"
+        meta.update(_encode_strings([json.dumps(value) if value is not None else None
+                                     for value in values], add))
+
+    return meta
+
+
+def _encode_strings(values: list[str | None], add) -> dict[str, Any]:
+
+    encoded = [value.encode("utf-8") if value is not None else b""
+               for value in values]
+    offsets = array("Q", accumulate((len(value) for value in encoded), initial=0))
+
+    return {"offsets": add(offsets.tobytes()),
+            "data": add(b"".join(encoded))}
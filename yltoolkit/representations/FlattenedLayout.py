@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Layout of nested values flattened into `key::subkey` columns.
+"""
+
+if __name__ == "__main__":
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "../..")))
+
+
+from collections.abc import Mapping
+from typing import Any, Iterable
+
+SEPARATOR = "::"
+
+# node of a compiled layout: column index of a value, or the nodes of a nested dictionary
+Node = int | dict[str, "Node"]
+
+
+class FlattenedLayout:
+    """
+    Columns of a CSV header compiled once into the shape of the rows they hold.
+    Rows are then unflattened by indexing, without splitting and merging keys for every row,
+    giving the same dictionaries as `flatten_dict.unflatten(..., splitter="double-colon")`.
+    """
+
+    def __init__(self, fieldnames: list[str], *, use_flatten: bool = True, columns: Iterable[str] = None) -> None:
+        """
+        @param columns: top-level keys to keep, `key` standing for its nested columns `key::...` too
+        """
+
+        self.fieldnames = fieldnames
+        self.shape = dict[str, Node]()
+
+        if columns is not None:
+            columns = set(columns)
+            selected = set[str]()
+
+        for index, fieldname in enumerate(fieldnames):
+
+            # empty field names are dropped, as `iter_csv` does
+            if fieldname == "":
+                continue
+
+            *parents, key = fieldname.split(SEPARATOR) \
+                if use_flatten else [fieldname]
+
+            if columns is not None:
+                top = parents[0] if parents else key
+
+                if fieldname in columns or top in columns:
+                    selected.update((fieldname, top))
+                else:
+                    continue
+
+            node = self.shape
+
+            for parent in parents:
+                node = node.setdefault(parent, {})
+
+                if type(node) is int:
+                    raise ValueError(
+                        f"Column {fieldname} is nested in a column with a value.")
+
+            if type(node.get(key)) is dict:
+                raise ValueError(
+                    f"Column {fieldname} has a value and nested columns.")
+
+            # the last column of duplicated names wins, as in `csv.DictReader`
+            node[key] = index
+
+        if columns is not None and not columns <= selected:
+            raise ValueError(
+                f"Columns {', '.join(sorted(columns - selected))} are not in the field names.")
+
+        self._width = len(fieldnames)
+        self._flat = all(type(node) is int for node in self.shape.values())
+
+        if self._flat and list(self.shape.values()) == list(range(self._width)):
+            self._names = list(self.shape)
+        else:
+            self._names = None
+
+    def index_of(self, key: str) -> int | None:
+        """
+        Column index of the top-level `key`, if it holds a value.
+        """
+
+        node = self.shape.get(key)
+        return node if type(node) is int else None
+
+    def unflatten(self, row: list[str]) -> dict[str, Any]:
+        """
+        Nested dictionary of a raw CSV row, short rows being padded with None.
+        """
+
+        if len(row) < self._width:
+            row = row + [None] * (self._width - len(row))
+
+        if self._names is not None:
+            return dict(zip(self._names, row))
+
+        return _build(self.shape, row)
+
+    @staticmethod
+    def flatten(items: Iterable[dict[str, Any]], fieldnames: list[str]) -> tuple[list[str], list[dict[str, Any]]]:
+        """
+        Flatten encoded items into rows in one pass, the way `flatten_dict.flatten` does with
+        `enumerate_types=(list, set)` and `keep_empty_types=(dict, set)`.
+        Return the columns, i.e. `fieldnames` each replaced by the nested columns found under it
+        (indexes of lists counted up to the largest one), followed by keys not in `fieldnames`, and the rows.
+        """
+
+        rows = list[dict[str, Any]]()
+        # top-level key -> nested columns, in order of appearance
+        nested = dict[str, dict[str, None]]()
+        # top-level keys with a value of their own
+        plain = dict[str, None]()
+
+        for item in items:
+            row = dict[str, Any]()
+
+            for key, value in item.items():
+
+                # written as empty cells either way, leaving the column to the nested values of other rows
+                if value is None:
+                    continue
+
+                if isinstance(value, _FLATTENABLE_TYPES):
+                    columns = nested.setdefault(key, {})
+
+                    if _flatten_into(row, key, value, columns) or not isinstance(value, _KEEP_EMPTY_TYPES):
+                        continue
+
+                if key in row:
+                    raise ValueError(f"duplicated key '{key}'")
+
+                row[key] = value
+                plain[key] = None
+
+            rows.append(row)
+
+        result = list[str]()
+
+        for key in dict.fromkeys([*fieldnames, *plain, *nested]):
+
+            columns = nested.get(key)
+
+            # keep the column of fields holding values, nothing or only empty lists
+            if key in plain or not columns:
+                result.append(key)
+
+            if columns:
+                result.extend(_ordered_columns(key, columns))
+
+        return result, rows
+
+
+_FLATTENABLE_TYPES = (Mapping, list, set)
+_KEEP_EMPTY_TYPES = (Mapping, set)
+
+
+def _build(shape: dict[str, Node], row: list[str]) -> dict[str, Any]:
+    return {key: row[node] if type(node) is int else _build(node, row)
+            for key, node in shape.items()}
+
+
+def _flatten_into(row: dict[str, Any], parent: str, value: Mapping | list | set, columns: dict[str, None]) -> bool:
+
+    pairs = value.items() if isinstance(value, Mapping) else enumerate(value)
+    has_item = False
+
+    for key, child in pairs:
+        has_item = True
+        name = f"{parent}{SEPARATOR}{key}"
+
+        if isinstance(child, _FLATTENABLE_TYPES):
+            if _flatten_into(row, name, child, columns) or not isinstance(child, _KEEP_EMPTY_TYPES):
+                continue
+
+        if name in row:
+            raise ValueError(f"duplicated key '{name}'")
+
+        row[name] = child
+        columns[name] = None
+
+    return has_item
+
+
+def _ordered_columns(key: str, columns: dict[str, None]) -> list[str]:
+
+    prefix = f"{key}{SEPARATOR}"
+    indexes = [name[len(prefix):] for name in columns]
+
+    # a plain list: every index up to the largest one, rows with shorter lists leaving the rest empty
+    if all(index.isdigit() for index in indexes):
+        return [f"{prefix}{i}" for i in range(max(map(int, indexes)) + 1)]
+
+    return list(columns)
@@ -15,6 +15,9 @@ if __name__ == "__main__":
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from typing import ClassVar
+
+from yltoolkit.hashing import DEFAULT_ALGORITHM, Algorithm, Hasher
 
 
 @dataclass
@@ -25,6 +28,8 @@ class HashableMixin(ABC):
 
     hash: str = field(default=None, kw_only=True, repr=False)
 
+    HASH_ALGORITHM: ClassVar[Algorithm] = DEFAULT_ALGORITHM
+
     def __post_init__(self, from_dict: dict[str, str] = None):
         super().__post_init__(from_dict)
 
@@ -34,3 +39,10 @@ class HashableMixin(ABC):
     @abstractmethod
     def hash_generator(self) -> str:
         pass
+
+    @classmethod
+    def new_hasher(cls) -> Hasher:
+        """
+        Streaming hasher of `HASH_ALGORITHM`, for `hash_generator` to feed fields or files into one at a time.
+        """
+        return Hasher(cls.HASH_ALGORITHM)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Dictionary of objects materialized on first access.
+"""
+
+if __name__ == "__main__":
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "../..")))
+
+
+from collections.abc import MutableMapping
+from typing import Any, Callable, Generic, Iterator, NamedTuple, TypeVar
+
+from .Codable import Codable
+
+C = TypeVar("C", bound=Codable)
+
+
+class LazySource(NamedTuple):
+    """
+    How raw entries of one decoded file become objects (`load`) or encoded dictionaries (`dump`).
+    `dump` must give what `to_dict` of the loaded object would.
+    `close` is called once no raw entry of the source is left: all materialized, replaced or removed.
+    """
+
+    load: Callable[[Any], Codable]
+    dump: Callable[[Any], dict[str, Any]]
+    close: Callable[[], None] | None = None
+
+
+class RawEntry:
+    """
+    Raw data of an object not materialized yet.
+    """
+
+    __slots__ = ("payload", "source")
+
+    def __init__(self, payload: Any, source: LazySource) -> None:
+        self.payload = payload
+        self.source = source
+
+
+class LazyObjectDict(MutableMapping, Generic[C]):
+    """
+    Objects keyed by normalized id, kept as raw entries until they are read.
+    Reading an item (`[]`, `get`, `values`, `items`) materializes it; keys, length and membership do not.
+    """
+
+    def __init__(self, objects: dict[str, C] = None) -> None:
+        self._entries: dict[str, C | RawEntry] = dict(objects or {})
+        # source -> number of its raw entries
+        self._raw_counts = dict[LazySource, int]()
+
+    def add_raw(self, key: str, payload: Any, source: LazySource):
+        self._release(key)
+        self._entries[key] = RawEntry(payload, source)
+        self._raw_counts[source] = self._raw_counts.get(source, 0) + 1
+
+    def _release(self, key: str):
+        """
+        Forget the raw entry of `key` if it has one, closing its source after its last raw entry.
+        """
+
+        value = self._entries.get(key)
+
+        if type(value) is not RawEntry:
+            return
+
+        count = self._raw_counts[value.source] - 1
+
+        if count:
+            self._raw_counts[value.source] = count
+        else:
+            del self._raw_counts[value.source]
+
+            if value.source.close is not None:
+                value.source.close()
+
+    def is_loaded(self, key: str) -> bool:
+        return type(self._entries[key]) is not RawEntry
+
+    @property
+    def loaded_count(self) -> int:
+        return sum(1 for value in self._entries.values()
+                   if type(value) is not RawEntry)
+
+    def encoded_values(self) -> Iterator[dict[str, Any]]:
+        """
+        Encoded dictionaries in order: raw entries are dumped without being materialized.
+        """
+
+        for value in self._entries.values():
+            if type(value) is RawEntry:
+                yield value.source.dump(value.payload)
+            else:
+                yield value.to_dict()
+
+    def __getitem__(self, key: str) -> C:
+
+        value = self._entries[key]
+
+        if type(value) is RawEntry:
+            loaded = value.source.load(value.payload)
+            self._release(key)
+            value = self._entries[key] = loaded
+
+        return value
+
+    def get(self, key: str, default: Any = None) -> C | Any:
+
+        if key not in self._entries:
+            return default
+
+        return self[key]
+
+    def __setitem__(self, key: str, value: C):
+        self._release(key)
+        self._entries[key] = value
+
+    def __delitem__(self, key: str):
+        self._release(key)
+        del self._entries[key]
+
+    def clear(self):
+
+        for source in self._raw_counts:
+            if source.close is not None:
+                source.close()
+
+        self._raw_counts.clear()
+        self._entries.clear()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self):
+        return self._entries.keys()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} items, {self.loaded_count} loaded)"
@@ -1,7 +1,61 @@
 #!/usr/bin/env python
 # coding=utf-8
 
-from .Codable import ID, Codable
-from .CodableSet import CodableSet
-from .HashableMixin import HashableMixin
-from .HashableSetMixin import HashableSetMixin
+"""
+Classes of this package are imported from their modules when first used:
+`Codable` alone does not pull in `CodableSet` and, through `file_handlers`, the file format support.
+"""
+
+import importlib
+import sys
+import types
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .Codable import ID, Codable
+    from .CodableSet import CodableSet
+    from .ColumnarSnapshot import ColumnarSnapshot
+    from .HashableMixin import HashableMixin
+    from .HashableSetMixin import HashableSetMixin
+
+# exported name: module defining it
+_EXPORTS = {
+    "ID": ".Codable",
+    "Codable": ".Codable",
+    "CodableSet": ".CodableSet",
+    "ColumnarSnapshot": ".ColumnarSnapshot",
+    "HashableMixin": ".HashableMixin",
+    "HashableSetMixin": ".HashableSetMixin",
+}
+
+__all__ = list(_EXPORTS)
+
+
+class _Package(types.ModuleType):
+
+    def __setattr__(self, name: str, value):
+        # importing a submodule sets it on the package, where the class of the same name is exported instead
+        if name in _EXPORTS and isinstance(value, types.ModuleType):
+            return
+
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
+
+
+def __getattr__(name: str):
+
+    module_name = _EXPORTS.get(name)
+
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
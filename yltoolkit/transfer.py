@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Copy and move files in bulk, copying file contents inside the kernel where the system allows it.
+"""
+
+if __name__ == "__main__":
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+
+import errno
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Literal, NamedTuple
+
+from yltoolkit.hashing import DEFAULT_ALGORITHM, Algorithm, hash_file
+from yltoolkit.YLEnum import YLEnum, auto
+
+COPY_CHUNK_SIZE = 1 << 30
+# errors of `copy_file_range` and `sendfile` meaning "not here", the next method is tried
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+
+class TransferStatus(YLEnum):
+    COPIED = auto()
+    MOVED = auto()
+    # the destination already has the same contents
+    SKIPPED = auto()
+    # the destination exists and is not overwritten, or another pair of the batch has it
+    CONFLICT = auto()
+    FAILED = auto()
+
+
+class TransferResult(NamedTuple):
+    source: Path
+    destination: Path
+    status: TransferStatus
+    size: int = 0
+    error: OSError | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status in (TransferStatus.COPIED, TransferStatus.MOVED, TransferStatus.SKIPPED)
+
+
+def _copy_range(source_fd: int, destination_fd: int, size: int) -> int:
+    """
+    Copy `size` bytes between file descriptors by the fastest method available, and return the bytes copied.
+    """
+
+    copied = 0
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            # the same filesystem may share blocks or copy on the server side
+            while copied < size:
+                count = os.copy_file_range(source_fd, destination_fd, min(COPY_CHUNK_SIZE, size - copied),
+                                           copied, copied)
+                if count == 0:
+                    break
+                copied += count
+        except OSError as error:
+            if error.errno not in _UNSUPPORTED:
+                raise
+
+    if copied < size and hasattr(os, "sendfile"):
+        os.lseek(destination_fd, copied, os.SEEK_SET)
+
+        try:
+            while copied < size:
+                count = os.sendfile(destination_fd, source_fd, copied, min(COPY_CHUNK_SIZE, size - copied))
+                if count == 0:
+                    break
+                copied += count
+        except OSError as error:
+            if error.errno not in _UNSUPPORTED:
+                raise
+
+    if copied < size:
+        os.lseek(source_fd, copied, os.SEEK_SET)
+        os.lseek(destination_fd, copied, os.SEEK_SET)
+
+        while chunk := os.read(source_fd, 1 << 20):
+            os.write(destination_fd, chunk)
+            copied += len(chunk)
+
+    return copied
+
+
+def copy_file(source: Path, destination: Path) -> int:
+    """
+    Copy the contents, permissions and times of a file, and return its size.
+    The copy is written aside and renamed, an interrupted copy leaves no partial destination;
+    an existing destination is replaced.
+    """
+
+    descriptor, temporary_path = tempfile.mkstemp(dir=destination.parent, prefix=f".{destination.name}.",
+                                                  suffix=".part")
+
+    try:
+        with open(descriptor, "wb") as destination_file, open(source, "rb") as source_file:
+            size = _copy_range(source_file.fileno(), destination_file.fileno(),
+                               os.fstat(source_file.fileno()).st_size)
+
+        shutil.copystat(source, temporary_path)
+        os.replace(temporary_path, destination)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+    return size
+
+
+def move_file(source: Path, destination: Path) -> int:
+    """
+    Rename a file, or copy then delete it when the destination is on another filesystem, and return its size.
+    An existing destination is replaced.
+    """
+
+    size = source.stat().st_size
+
+    try:
+        os.replace(source, destination)
+    except OSError as error:
+        if error.errno != errno.EXDEV:
+            raise
+
+        copy_file(source, destination)
+        source.unlink()
+
+    return size
+
+
+def is_identical(source: Path, destination: Path, algorithm: Algorithm = DEFAULT_ALGORITHM) -> bool:
+    """
+    Whether both files have the same size and hash, the hash being computed only for files of the same size.
+    """
+
+    try:
+        if source.stat().st_size != destination.stat().st_size:
+            return False
+    except FileNotFoundError:
+        return False
+
+    return hash_file(source, algorithm) == hash_file(destination, algorithm)
+
+
+def transfer_file(source: Path, destination: Path, mode: Literal["copy", "move"] = "copy", *,
+                  overwrite: bool = False,
+                  skip_identical: bool = False,
+                  algorithm: Algorithm = DEFAULT_ALGORITHM,
+                  make_parents: bool = True) -> TransferResult:
+    """
+    Copy or move one file, reporting the outcome rather than raising `OSError`.
+    """
+
+    try:
+        if destination.exists():
+            if skip_identical and is_identical(source, destination, algorithm):
+                size = source.stat().st_size
+
+                # moving onto identical contents: the source goes, as after a move
+                if mode == "move" and not os.path.samefile(source, destination):
+                    source.unlink()
+
+                return TransferResult(source, destination, TransferStatus.SKIPPED, size)
+
+            if not overwrite:
+                return TransferResult(source, destination, TransferStatus.CONFLICT,
+                                      error=FileExistsError(errno.EEXIST, "Destination exists", str(destination)))
+
+        if make_parents:
+            destination.parent.mkdir(parents=True, exist_ok=True)
+
+        match mode:
+            case "copy":
+                return TransferResult(source, destination, TransferStatus.COPIED, copy_file(source, destination))
+            case "move":
+                return TransferResult(source, destination, TransferStatus.MOVED, move_file(source, destination))
+            case _:
+                raise NotImplementedError(f"Transfer mode {mode} is not supported.")
+
+    except OSError as error:
+        return TransferResult(source, destination, TransferStatus.FAILED, error=error)
+
+
+def transfer_pairs(pairs: Iterable[tuple[Path, Path]], mode: Literal["copy", "move"] = "copy", *,
+                   workers: int = None,
+                   overwrite: bool = False,
+                   skip_identical: bool = False,
+                   algorithm: Algorithm = DEFAULT_ALGORITHM,
+                   make_parents: bool = True) -> list[TransferResult]:
+    """
+    Copy or move (source, destination) pairs in a thread pool, and return the results in the order of the pairs.
+    A destination given by several pairs is transferred for the first one only, the others are conflicts.
+    @param workers: threads transferring files, default to `ThreadPoolExecutor`'s
+    @param skip_identical: leave an existing destination of the same size and hash as it is
+    """
+
+    if mode not in ("copy", "move"):
+        raise NotImplementedError(f"Transfer mode {mode} is not supported.")
+
+    pairs = [(Path(source), Path(destination)) for source, destination in pairs]
+
+    claimed = set[Path]()
+    duplicated = set[int]()
+
+    for index, (_, destination) in enumerate(pairs):
+        key = destination.absolute()
+
+        if key in claimed:
+            duplicated.add(index)
+        else:
+            claimed.add(key)
+
+    def run(index: int) -> TransferResult:
+        source, destination = pairs[index]
+
+        if index in duplicated:
+            return TransferResult(source, destination, TransferStatus.CONFLICT,
+                                  error=FileExistsError(errno.EEXIST, "Destination given twice", str(destination)))
+
+        return transfer_file(source, destination, mode, overwrite=overwrite, skip_identical=skip_identical,
+                             algorithm=algorithm, make_parents=make_parents)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run, range(len(pairs))))
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+
+"""
+Directory walker and snapshots of directory trees.
+"""
+
+if __name__ == "__main__":
+    import sys
+    from os.path import abspath, dirname, join
+
+    sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Iterator, Literal, NamedTuple, Self
+
+# follow no symbolic link, links to files only (as `Path.glob("**/*")`), or links to directories too
+FollowSymlinks = bool | Literal["files"]
+
+
+class FileEntry(NamedTuple):
+    """
+    A file met by `walk_files`, with the stat data of its directory entry.
+    `inode` and `dev` are 0 where directory entries do not tell them (Windows).
+    """
+
+    path: Path
+    size: int
+    mtime_ns: int
+    inode: int
+    dev: int = 0
+
+    @classmethod
+    def from_dir_entry(cls, entry: os.DirEntry, follow_symlinks: bool = False) -> Self:
+        # `DirEntry.stat` caches its result: one system call at most per entry
+        stat = entry.stat(follow_symlinks=follow_symlinks)
+        return cls(Path(entry.path), stat.st_size, stat.st_mtime_ns, stat.st_ino, stat.st_dev)
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+
+def scan_directory(directory: str, *, follow_symlinks: FollowSymlinks = False) -> tuple[list[FileEntry], list[str]]:
+    """
+    Files and subdirectories directly in `directory`. Directories that cannot be read are skipped.
+    """
+
+    files = list[FileEntry]()
+    subdirectories = list[str]()
+
+    follow_directories = follow_symlinks is True
+    follow_files = bool(follow_symlinks)
+
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    # file types come from the directory listing, without a stat call
+                    if entry.is_dir(follow_symlinks=follow_directories):
+                        subdirectories.append(entry.path)
+                    elif entry.is_file(follow_symlinks=follow_files):
+                        files.append(FileEntry.from_dir_entry(
+                            entry, follow_symlinks=follow_files))
+                except OSError:
+                    # removed or unreadable since listed
+                    continue
+    except (PermissionError, FileNotFoundError, NotADirectoryError):
+        pass
+
+    return files, subdirectories
+
+
+def walk_files(directory: Path, *, follow_symlinks: FollowSymlinks = False, workers: int = None) -> Iterator[FileEntry]:
+    """
+    Files of a directory tree, yielded as their directories are scanned.
+    @param follow_symlinks: walk into linked directories and stat linked files, beware of cycles;
+        "files" to stat linked files but not walk into linked directories
+    @param workers: scan directories in this many threads, yielding files in no particular order
+    """
+
+    if workers is None or workers <= 1:
+        stack = [os.fspath(directory)]
+
+        while stack:
+            files, subdirectories = scan_directory(
+                stack.pop(), follow_symlinks=follow_symlinks)
+
+            yield from files
+
+            # depth first, in listing order
+            stack.extend(reversed(subdirectories))
+
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(scan_directory, os.fspath(directory),
+                                   follow_symlinks=follow_symlinks)}
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                files, subdirectories = future.result()
+
+                pending |= {executor.submit(scan_directory, subdirectory,
+                                            follow_symlinks=follow_symlinks)
+                            for subdirectory in subdirectories}
+
+                yield from files
+
+
+class SnapshotDiff(NamedTuple):
+    """
+    Relative paths of files added, removed and modified (size, modification time or inode changed) between snapshots.
+    """
+
+    added: list[str]
+    removed: list[str]
+    modified: list[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+class DirectorySnapshot:
+    """
+    Stat data of the files of a directory tree, keyed by path relative to the tree root.
+    """
+
+    def __init__(self, root: Path, entries: dict[str, tuple[int, int, int]] = None) -> None:
+        self.root = root
+        # relative path -> (size, mtime_ns, inode)
+        self.entries = entries if entries is not None else dict[str, tuple[int, int, int]]()
+
+    @classmethod
+    def scan(cls, root: Path, *, follow_symlinks: FollowSymlinks = False, workers: int = None) -> Self:
+
+        prefix = len(os.fspath(root).rstrip(os.sep)) + 1
+
+        entries = {os.fspath(entry.path)[prefix:]: (entry.size, entry.mtime_ns, entry.inode)
+                   for entry in walk_files(root, follow_symlinks=follow_symlinks, workers=workers)}
+
+        return cls(root, entries)
+
+    def diff(self, newer: "DirectorySnapshot") -> SnapshotDiff:
+        """
+        Changes from this snapshot to a newer one.
+        """
+
+        old, new = self.entries, newer.entries
+
+        return SnapshotDiff(added=[path for path in new if path not in old],
+                            removed=[path for path in old if path not in new],
+                            modified=[path for path, stat in new.items()
+                                      if path in old and old[path] != stat])
+
+    def save(self, filepath: Path):
+
+        # written aside then moved, an interrupted save leaves the previous snapshot
+        temporary_filepath = filepath.with_name(f"{filepath.name}.tmp")
+
+        with open(temporary_filepath, "w", encoding="utf-8") as file:
+            json.dump({"root": os.fspath(self.root),
+                       "entries": [[path, *stat] for path, stat in self.entries.items()]},
+                      file, separators=(",", ":"))
+
+        os.replace(temporary_filepath, filepath)
+
+    @classmethod
+    def load(cls, filepath: Path) -> Self:
+
+        with open(filepath, "r", encoding="utf-8") as file:
+            snapshot = json.load(file)
+
+        return cls(Path(snapshot["root"]),
+                   {path: (size, mtime_ns, inode)
+                    for path, size, mtime_ns, inode in snapshot["entries"]})
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.entries
+
+
+def rescan(root: Path, snapshot_filepath: Path, *, follow_symlinks: FollowSymlinks = False, workers: int = None) -> SnapshotDiff:
+    """
+    Scan a directory tree, compare it with the snapshot saved at `snapshot_filepath` and save the new snapshot there.
+    Every file is reported as added when no snapshot was saved yet.
+    """
+
+    if snapshot_filepath.exists():
+        previous = DirectorySnapshot.load(snapshot_filepath)
+    else:
+        previous = DirectorySnapshot(root)
+
+    current = DirectorySnapshot.scan(
+        root, follow_symlinks=follow_symlinks, workers=workers)
+
+    current.save(snapshot_filepath)
+
+    return previous.diff(current)